@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+TRACK_EXTENSIONS = ('.csv', '.kml', '.track')
+
+# Parameters of one pipeline run; parameter sets override any subset of these.
+# Lengths are metres in the track frame, so one set suits every circuit.
+DEFAULT_PARAMS = {
+    'resample_spacing': 5.0,  # metres between resampled boundary points
+    'resample_points': None,  # fixed count instead of resample_spacing
+    'curvature_threshold': 0.001,  # 1/m, corners tighter than 1 km radius
+    'cluster_threshold': 50.0,  # metres
+    'pairing_distance': 100.0,  # metres
+    'method': 'min_curvature',  # 'min_curvature', 'lap_time' or 'adaptive'
+    'segment_spacing': 8.0,  # metres between racing line samples
+    'nseg': None,  # fixed count instead of segment_spacing
+    'base_influence': 30,
+    'max_deviation': 0.6,
+    'friction': 1.0,
+}
+
+
+def find_track_files(track_dir):
+    return sorted(os.path.join(track_dir, name) for name in os.listdir(track_dir)
+                  if name.lower().endswith(TRACK_EXTENSIONS))
+
+
+def load_boundaries(track_file):
+    # Returns inner, outer and (if the file has one) center line; track stores load memory-mapped
+    if track_file.lower().endswith('.kml'):
+        from kml_reader import read_track_kml
+        outer, inner = read_track_kml(track_file)
+        return inner, outer, None
+
+    from final import load_track_data
+    inner, outer, center = load_track_data(track_file)
+    if inner is None or outer is None or len(inner) < 4 or len(outer) < 4:
+        raise ValueError(f"No usable inner/outer boundary rows in {track_file}")
+    return inner, outer, center
+
+
+def sample_count(length, spacing, count=None):
+    # Samples for a line of this length: the fixed count if given, else one per spacing metres
+    if count:
+        return int(count)
+    return max(int(np.ceil(length / spacing)), 4)
+
+
+def run_pipeline(track_file, params, cache=None):
+    """
+    parse -> resample -> apex detection -> racing line -> speed profile for
+    one track. Returns the lon/lat boundaries, racing line and apexes, the
+    speed profile, lap time and per-stage timings.
+
+    The boundaries are projected into the track frame once after parsing
+    and every later stage works in metres; only the outputs are converted
+    back to lon/lat.
+
+    With a ResultCache, every stage after parsing is looked up by the hash
+    of the track geometry and the parameters it depends on, so re-runs of
+    an unchanged track only pay for parsing.
+    """
+    from curvature import curvature, detect_apexes
+    from track_curve import TrackCurve
+    from track_frame import track_frame
+    from speed_profile import path_speed_profile
+
+    timings = {}
+
+    def timed(stage, func, arrays=(), stage_params=None):
+        start = time.perf_counter()
+        if cache is None:
+            result = func()
+        else:
+            result = cache.memoize(stage, func, arrays, stage_params)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    start = time.perf_counter()
+    inner, outer, center = load_boundaries(track_file)
+    frame = track_frame(outer)
+    inner_m, outer_m = frame.forward(inner), frame.forward(outer)
+    center_m = None if center is None else frame.forward(center)
+    timings['parse'] = time.perf_counter() - start
+    geometry = (inner, outer) if center is None else (inner, outer, center)
+
+    resample_params = {name: params[name] for name in ('resample_spacing', 'resample_points')}
+    apex_params = {**resample_params, **{name: params[name] for name in
+                                         ('curvature_threshold', 'cluster_threshold', 'pairing_distance')}}
+
+    inner_curve, outer_curve = TrackCurve(inner_m), TrackCurve(outer_m)
+    n_samples = sample_count(max(inner_curve.length, outer_curve.length), params['resample_spacing'],
+                             params['resample_points'])
+
+    def resample():
+        return inner_curve.sample(n_samples), outer_curve.sample(n_samples)
+
+    inner_rs, outer_rs = timed('resample', resample, geometry, resample_params)
+
+    def apexes():
+        k_inner = curvature(inner_rs, curve=inner_curve)
+        k_outer = curvature(outer_rs, curve=outer_curve)
+        final_inner, final_outer = detect_apexes(inner_rs, outer_rs, k_inner, k_outer,
+                                                 curvature_threshold=params['curvature_threshold'],
+                                                 cluster_threshold=params['cluster_threshold'],
+                                                 pairing_distance=params['pairing_distance'])
+        return np.vstack([inner_rs[final_inner], outer_rs[final_outer]]).reshape(-1, 2)
+
+    apex_points = timed('apexes', apexes, geometry, apex_params)
+
+    def racing_line():
+        method = params['method']
+        nseg = sample_count(outer_curve.length, params['segment_spacing'], params['nseg'])
+        if method == 'min_curvature':
+            from min_curvature import min_curvature_path
+            return min_curvature_path(outer_m, inner_m, nseg=nseg)
+        if method == 'lap_time':
+            from lap_time import min_lap_time_path
+            path, _ = min_lap_time_path(outer_m, inner_m, nseg=nseg, friction=params['friction'],
+                                        metric=True)
+            return path
+        if method == 'adaptive':
+            from final import find_closest_center_points, create_adaptive_path
+            center_line = (inner_rs + outer_rs) / 2 if center_m is None else TrackCurve(center_m).sample(
+                n_samples)
+            apex_data = [{'point': point, 'curvature': 1.0} for point in apex_points]
+            apex_info = find_closest_center_points(center_line, apex_data)
+            return create_adaptive_path(center_line, apex_info, base_influence=params['base_influence'],
+                                        max_deviation=params['max_deviation'], closed=True)
+        raise ValueError(f"Unknown racing line method: {method}")
+
+    line_params = {name: params[name] for name in ('method', 'segment_spacing', 'nseg', 'friction',
+                                                   'base_influence', 'max_deviation')}
+    line = timed('racing_line', racing_line, geometry, {**apex_params, **line_params})
+
+    profile = timed('speed_profile', lambda: path_speed_profile(line, friction=params['friction'], metric=True),
+                    (line,), {'friction': params['friction']})
+
+    return {
+        'inner': inner,
+        'outer': outer,
+        'racing_line': frame.inverse(line),
+        'apex_points': frame.inverse(apex_points),
+        'profile': profile,
+        'lap_time': profile['lap_time'],
+        'timings': timings,
+    }
+
+
+def process_track(track_file, param_name, params, cache_dir=None):
+    # Worker entry point: never raises, so one bad track cannot stop the batch
+    start = time.perf_counter()
+    result = {'track': os.path.basename(track_file), 'params': param_name}
+    try:
+        cache = None
+        if cache_dir is not None:
+            from result_cache import ResultCache
+            cache = ResultCache(cache_dir)
+        output = run_pipeline(track_file, {**DEFAULT_PARAMS, **params}, cache=cache)
+        result.update(status='ok', lap_time=output['lap_time'], apexes=len(output['apex_points']),
+                      timings=output['timings'], racing_line=output['racing_line'])
+    except Exception as e:
+        result.update(status='failed', error=f"{type(e).__name__}: {e}", traceback=traceback.format_exc())
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_batch(track_dir, param_sets=None, max_workers=None, cache_dir=None):
+    """
+    Run every track in track_dir with every parameter set across a process
+    pool. param_sets maps a name to parameter overrides. Returns one result
+    dict per (track, parameter set), in submission order. Workers share the
+    on-disk result cache in cache_dir, if given.
+    """
+    param_sets = param_sets or {'default': {}}
+    jobs = [(track_file, name, params)
+            for track_file in find_track_files(track_dir)
+            for name, params in param_sets.items()]
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_track, *job, cache_dir=cache_dir): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            track_file, name, _ = jobs[i]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. out of memory)
+                results[i] = {'track': os.path.basename(track_file), 'params': name, 'status': 'failed',
+                              'error': f"{type(e).__name__}: {e}", 'seconds': float('nan')}
+    return results
+
+
+def print_summary(results):
+    stages = ['parse', 'resample', 'apexes', 'racing_line', 'speed_profile']
+    header = f"{'track':<28} {'params':<14} {'status':<7} {'lap [s]':>8} {'apexes':>6} " + \
+             " ".join(f"{stage[:11]:>11}" for stage in stages) + f" {'total [s]':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if r['status'] == 'ok':
+            stage_times = " ".join(f"{r['timings'].get(stage, float('nan')):>11.3f}" for stage in stages)
+            print(f"{r['track']:<28} {r['params']:<14} {'ok':<7} {r['lap_time']:>8.2f} {r['apexes']:>6} "
+                  f"{stage_times} {r['seconds']:>9.3f}")
+        else:
+            print(f"{r['track']:<28} {r['params']:<14} {'failed':<7} {r['error']}")
+
+    failed = sum(r['status'] != 'ok' for r in results)
+    print(f"\n{len(results) - failed} succeeded, {failed} failed")
+
+
+def save_results(results, output_dir):
+    # One racing line CSV per successful (track, parameter set)
+    os.makedirs(output_dir, exist_ok=True)
+    for r in results:
+        if r['status'] == 'ok':
+            name = f"{os.path.splitext(r['track'])[0]}_{r['params']}_racing_line.csv"
+            np.savetxt(os.path.join(output_dir, name), r['racing_line'],
+                       delimiter=',', header='longitude,latitude', comments='')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute racing lines for a directory of tracks in parallel.")
+    parser.add_argument('track_dir', help="Directory with track CSV/KML files")
+    parser.add_argument('--params', help="JSON file mapping parameter set names to parameter overrides")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', help="Directory to write racing line CSVs to")
+    parser.add_argument('--cache-dir', default=None, help="Result cache directory (default: ~/.cache/racing_line)")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute every stage instead of using the cache")
+    args = parser.parse_args()
+
+    param_sets = None
+    if args.params:
+        with open(args.params) as f:
+            param_sets = json.load(f)
+
+    cache_dir = None
+    if not args.no_cache:
+        from result_cache import DEFAULT_CACHE_DIR
+        cache_dir = args.cache_dir or DEFAULT_CACHE_DIR
+
+    start = time.perf_counter()
+    results = run_batch(args.track_dir, param_sets, max_workers=args.workers, cache_dir=cache_dir)
+    print_summary(results)
+    print(f"Wall time: {time.perf_counter() - start:.2f} s")
+
+    if args.output:
+        save_results(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+import numpy as np
+from benchmark_min_curvature import synthetic_track
+from friction_field import FrictionField
+
+# Configuration
+RESOLUTIONS = [500, 1000, 2000, 4000]
+CELL_SIZES = [1.0, 0.5, 0.25]  # metres
+
+
+def legacy_field(outer, inner, resolution):
+    # The previous generate_friction_gradient + create_track_mask: whole bounding box, then cv2 mask
+    import cv2
+    from scipy.interpolate import griddata
+
+    x_min, x_max = outer[:, 0].min(), outer[:, 0].max()
+    y_min, y_max = outer[:, 1].min(), outer[:, 1].max()
+    x_grid, y_grid = np.meshgrid(np.linspace(x_min, x_max, resolution), np.linspace(y_min, y_max, resolution))
+    track_points = np.vstack([outer, inner])
+    grid = griddata(track_points, np.linspace(0.8, 1.2, len(track_points)), (x_grid, y_grid), method='linear')
+
+    mask = np.zeros_like(x_grid, dtype=np.uint8)
+    scale = np.array([resolution / (x_max - x_min), resolution / (y_max - y_min)])
+    cv2.fillPoly(mask, [((outer - [x_min, y_min]) * scale).astype(np.int32)], 1)
+    cv2.fillPoly(mask, [((inner - [x_min, y_min]) * scale).astype(np.int32)], 0)
+    return grid, mask, grid.nbytes + mask.nbytes + x_grid.nbytes + y_grid.nbytes
+
+
+def field_bytes(field):
+    return sum(a.nbytes for a in (field.mask, field.cells, field.values, field._weights, field._vertices))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    outer, inner = synthetic_track(4000)
+
+    print(f"{'grid':>12} {'legacy [s]':>11} {'legacy [MB]':>12} {'field [s]':>10} {'field [MB]':>11} "
+          f"{'update [ms]':>12} {'max diff':>9}")
+    print("-" * 84)
+    for resolution in RESOLUTIONS:
+        (grid, _, legacy_bytes), legacy_time = timed(legacy_field, outer, inner, resolution)
+        field, field_time = timed(FrictionField, outer, inner, resolution=resolution)
+        _, update_time = timed(field.set_control_values, field.control_values[::-1])
+        field.set_control_values(field.control_values[::-1])
+        diff = np.nanmax(np.abs(field.grid()[field.mask] - grid[field.mask]))
+        print(f"{resolution:>5}x{resolution:<6} {legacy_time:>11.3f} {legacy_bytes / 2 ** 20:>12.1f} "
+              f"{field_time:>10.3f} {field_bytes(field) / 2 ** 20:>11.1f} {update_time * 1e3:>12.2f} {diff:>9.1e}")
+
+    print()
+    for cell_size in CELL_SIZES:
+        field, field_time = timed(FrictionField, outer, inner, cell_size=cell_size)
+        rows, cols = field.shape
+        print(f"{cell_size:>5} m cells: {rows}x{cols} grid, {len(field.cells)} on track, "
+              f"{field_time:.3f} s, {field_bytes(field) / 2 ** 20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+
+# Configuration
+LIBRARY_MODULES = ['min_curvature', 'kml_to_path', 'vizualize', 'result_cache', 'track_store', 'friction_map', 'track_frame']
+HEAVY_MODULES = ['cv2', 'matplotlib', 'pandas', 'requests', 'pykml', 'simplekml', 'scipy']
+IMPORT_BUDGET_MS = 100.0  # Import cost on top of NumPy, which every module needs
+REPEATS = 5
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ','.join(heavy))
+"""
+
+
+def time_import(module):
+    # Fresh interpreter per measurement so nothing is cached in sys.modules
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', probe], cwd=here, check=True,
+                            capture_output=True, text=True).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+
+def median_import(module):
+    samples = [time_import(module) for _ in range(REPEATS)]
+    times = sorted(t for t, _ in samples)
+    return times[len(times) // 2], samples[-1][1]
+
+
+def main():
+    baseline, _ = median_import('numpy')
+    print(f"numpy baseline: {baseline:.1f} ms\n")
+    print(f"{'module':<16} {'import [ms]':>12} {'over numpy':>11}  heavy modules loaded")
+    print("-" * 70)
+
+    failures = []
+    for module in LIBRARY_MODULES:
+        elapsed, heavy = median_import(module)
+        overhead = elapsed - baseline
+        print(f"{module:<16} {elapsed:>12.1f} {overhead:>11.1f}  {', '.join(heavy) or '-'}")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at module level")
+        if overhead > IMPORT_BUDGET_MS:
+            failures.append(f"{module} import takes {overhead:.1f} ms over NumPy (budget {IMPORT_BUDGET_MS:.0f} ms)")
+
+    if failures:
+        print("\nImport-time regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll library modules are within the import budget.")
+
+
+if __name__ == "__main__":
+    main()
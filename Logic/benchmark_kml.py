@@ -0,0 +1,93 @@
+import os
+import tempfile
+import time
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
+import numpy as np
+from benchmark_min_curvature import synthetic_track
+from kml_reader import read_track_kml
+
+# Configuration
+VERTEX_COUNTS = [2000, 20000, 100000]
+MARKER_PLACEMARKS = 500  # Point placemarks (corner names etc.) around the boundaries
+
+
+def write_track_kml(path, n_points, names=('Line 3', 'Line 1'), centre_name=None):
+    # centre_name also writes the centre line between the boundaries as a placemark of that name
+    outer, inner = synthetic_track(n_points)
+    with open(path, 'w') as f:
+        f.write('<?xml version="1.0"?><kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n')
+        # Inner boundary written first, so matching by document order would swap the two
+        placemarks = [(names[0], inner), (names[1], outer)]
+        if centre_name is not None:
+            placemarks.insert(1, (centre_name, (inner + outer) / 2))
+        for name, line in placemarks:
+            coords = ' '.join(f'{lon:.15g},{lat:.15g},0' for lon, lat in line)
+            f.write(f'<Placemark><name>{name}</name><LineString><coordinates>{coords}'
+                    f'</coordinates></LineString></Placemark>\n')
+        for i, (lon, lat) in enumerate(outer[::max(1, len(outer) // MARKER_PLACEMARKS)]):
+            f.write(f'<Placemark><name>Marker {i}</name><Point><coordinates>{lon:.15g},{lat:.15g},0'
+                    f'</coordinates></Point></Placemark>\n')
+        f.write('</Document></kml>\n')
+    return outer, inner
+
+
+def legacy_parse_kml(file_path):
+    # The previous kml_to_path.parse_kml: full tree, per-point split, placemarks matched by name
+    root = ET.parse(file_path).getroot()
+    ns = {'kml': 'http://www.opengis.net/kml/2.2'}
+    outer_coords, inner_coords = [], []
+    for placemark in root.findall('.//kml:Placemark', ns):
+        name = placemark.find('kml:name', ns).text
+        coordinates = placemark.find('.//kml:coordinates', ns).text.strip()
+        coords_list = [tuple(map(float, coord.split(','))) for coord in coordinates.split()]
+        if name == 'Line 1':
+            outer_coords = coords_list
+        elif name == 'Line 3':
+            inner_coords = coords_list
+    return np.array([(x, y) for x, y, _ in outer_coords]), np.array([(x, y) for x, y, _ in inner_coords])
+
+
+def check_centre_line(tmp, n_points=2000):
+    # A centre line between the boundaries must not be taken for the inner boundary,
+    # whether the placemarks carry the usual names or the boundaries are found by geometry
+    for names, centre_name in [(('Line 3', 'Line 1'), 'Line 2'), (('Inner', 'Outer'), 'Centre')]:
+        path = os.path.join(tmp, f'centre_{centre_name}.kml')
+        outer, inner = write_track_kml(path, n_points, names, centre_name)
+        found_outer, found_inner = read_track_kml(path)
+        assert np.allclose(found_outer, outer) and np.allclose(found_inner, inner), names
+
+
+def measure(func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main():
+    print(f"{'vertices':>9} {'legacy [s]':>11} {'legacy [MB]':>12} {'stream [s]':>11} {'stream [MB]':>12} {'kmz [s]':>8}")
+    print("-" * 70)
+    with tempfile.TemporaryDirectory() as tmp:
+        check_centre_line(tmp)
+        for n_points in VERTEX_COUNTS:
+            kml_path = os.path.join(tmp, f'track_{n_points}.kml')
+            outer, inner = write_track_kml(kml_path, n_points)
+            kmz_path = os.path.join(tmp, f'track_{n_points}.kmz')
+            with zipfile.ZipFile(kmz_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.write(kml_path, 'doc.kml')
+
+            _, legacy_time, legacy_mem = measure(legacy_parse_kml, kml_path)
+            (found_outer, found_inner), stream_time, stream_mem = measure(read_track_kml, kml_path)
+            _, kmz_time, _ = measure(read_track_kml, kmz_path)
+            assert np.allclose(found_outer, outer) and np.allclose(found_inner, inner)
+            print(f"{n_points:>9} {legacy_time:>11.3f} {legacy_mem:>12.1f} {stream_time:>11.3f} "
+                  f"{stream_mem:>12.1f} {kmz_time:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
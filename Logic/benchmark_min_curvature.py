@@ -0,0 +1,64 @@
+import time
+import numpy as np
+from min_curvature import min_curvature_path, resample_boundaries, assemble_curvature_qp
+
+# Configuration
+SEGMENT_COUNTS = [250, 500, 1000, 1500, 5000, 10000, 20000]
+MAX_SLSQP_SEGMENTS = 1500  # The dense solver is too slow to sweep further
+REPEATS = 3
+
+
+def synthetic_track(n_points=2000, width=0.0006):
+    # Closed wavy loop roughly the size of a circuit, in degrees
+    t = np.linspace(0, 2 * np.pi, n_points, endpoint=False)
+    r = 1 + 0.3 * np.sin(3 * t) + 0.15 * np.cos(5 * t)
+    center = np.column_stack([1.5 * r * np.cos(t), r * np.sin(t)]) * 0.01
+
+    tangent = np.roll(center, -1, axis=0) - np.roll(center, 1, axis=0)
+    normal = np.column_stack([tangent[:, 1], -tangent[:, 0]])
+    normal /= np.linalg.norm(normal, axis=1)[:, None]
+
+    outer = center + width * normal
+    inner = center - width * normal
+    # Repeat the first point so both boundaries are explicitly closed
+    return np.vstack([outer, outer[:1]]), np.vstack([inner, inner[:1]])
+
+
+def curvature_cost(path):
+    return np.sum((path[2:] + path[:-2] - 2 * path[1:-1]) ** 2)
+
+
+def time_solver(outer, inner, nseg, solver):
+    best = np.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        path = min_curvature_path(outer, inner, nseg=nseg, solver=solver)
+        best = min(best, time.perf_counter() - start)
+    return best, curvature_cost(path)
+
+
+def main():
+    outer, inner = synthetic_track()
+
+    print(f"{'nseg':>7} | {'slsqp [s]':>10} | {'sparse [s]':>10} | {'speedup':>8} | "
+          f"{'slsqp cost':>11} | {'sparse cost':>11}")
+    print("-" * 73)
+    for nseg in SEGMENT_COUNTS:
+        sparse_time, sparse_cost = time_solver(outer, inner, nseg, 'sparse')
+        if nseg <= MAX_SLSQP_SEGMENTS:
+            dense_time, dense_cost = time_solver(outer, inner, nseg, 'slsqp')
+            print(f"{nseg:>7} | {dense_time:>10.3f} | {sparse_time:>10.3f} | "
+                  f"{dense_time / sparse_time:>7.1f}x | {dense_cost:>11.3e} | {sparse_cost:>11.3e}")
+        else:
+            print(f"{nseg:>7} | {'-':>10} | {sparse_time:>10.3f} | {'-':>8} | {'-':>11} | {sparse_cost:>11.3e}")
+
+    # Assembly on its own, to show it stays linear in nseg
+    outer_interp, inner_interp = resample_boundaries(outer, inner, SEGMENT_COUNTS[-1])
+    delta = outer_interp - inner_interp
+    start = time.perf_counter()
+    assemble_curvature_qp(inner_interp[:-1], delta[:-1, 0], delta[:-1, 1])
+    print(f"\nSparse H/B assembly at nseg={SEGMENT_COUNTS[-1]}: {time.perf_counter() - start:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
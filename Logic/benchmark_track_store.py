@@ -0,0 +1,51 @@
+import csv
+import os
+import tempfile
+import time
+import numpy as np
+from benchmark_min_curvature import synthetic_track
+from final import load_track_data
+from track_store import convert_track
+
+# Configuration
+POINT_COUNTS = [2000, 20000, 200000]
+REPEATS = 3
+
+
+def write_track_csv(path, n_points):
+    outer, inner = synthetic_track(n_points)
+    center = (outer + inner) / 2
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['inner_lon', 'inner_lat', 'outer_lon', 'outer_lat', 'center_lon', 'center_lat'])
+        writer.writerows(np.hstack([inner, outer, center]))
+
+
+def time_load(path):
+    best = np.inf
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        inner, outer, center = load_track_data(path)
+        # Touch the data so memory-mapped loads are not measured as free
+        checksum = inner.sum() + outer.sum() + center.sum()
+        best = min(best, time.perf_counter() - start)
+    return best, checksum
+
+
+def main():
+    print(f"{'points':>8} {'CSV [ms]':>10} {'store [ms]':>11} {'speedup':>8}")
+    print("-" * 42)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_points in POINT_COUNTS:
+            csv_path = os.path.join(tmp, f'track_{n_points}.csv')
+            write_track_csv(csv_path, n_points)
+            store_path = convert_track(csv_path)
+
+            csv_time, csv_sum = time_load(csv_path)
+            store_time, store_sum = time_load(store_path)
+            assert np.isclose(csv_sum, store_sum)
+            print(f"{n_points:>8} {csv_time * 1e3:>10.2f} {store_time * 1e3:>11.2f} {csv_time / store_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
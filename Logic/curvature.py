@@ -1,11 +1,21 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import csv
-from scipy.interpolate import interp1d
-from scipy.spatial.distance import cdist
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from spatial_index import TrackIndex
+from track_curve import TrackCurve, path_curvature
+from track_frame import track_frame
+from track_store import is_track_store, load_track
 
 
 def parse_csv_coordinates(csv_file):
+    if is_track_store(csv_file):
+        # Same inner/outer assignment as the CSV columns below
+        track = load_track(csv_file, ['inner', 'outer'])
+        return track['outer'], track['inner']
+
     inner_points = []
     outer_points = []
 
@@ -30,33 +40,18 @@ def parse_csv_coordinates(csv_file):
     return np.array(inner_points), np.array(outer_points)
 
 
-def resample_curve(points, n_points=1000):
-    dist = np.zeros(len(points))
-    for i in range(1, len(points)):
-        dist[i] = dist[i - 1] + np.linalg.norm(points[i] - points[i - 1])
-
-    fx = interp1d(dist, points[:, 0], kind='cubic')
-    fy = interp1d(dist, points[:, 1], kind='cubic')
-
-    new_dist = np.linspace(0, dist[-1], n_points)
-    new_x = fx(new_dist)
-    new_y = fy(new_dist)
-
-    return np.vstack((new_x, new_y)).T
-
-
-def curvature(points):
-    x = points[:, 0]
-    y = points[:, 1]
-
-    dx = np.gradient(x)
-    dy = np.gradient(y)
+def resample_curve(points, n_points=1000, closed=True, curve=None):
+    # Pass a fitted TrackCurve to re-sample at another resolution without refitting
+    if curve is None:
+        curve = TrackCurve(points, closed=closed)
+    return curve.sample(n_points)
 
-    ddx = np.gradient(dx)
-    ddy = np.gradient(dy)
 
-    k = (dx * ddy - dy * ddx) / (dx * dx + dy * dy) ** 1.5
-    return k
+def curvature(points, closed=True, metric=False, curve=None):
+    # Analytic curvature from spline derivatives; reuse the curve that produced the samples if given
+    if curve is not None:
+        return curve.curvature(curve.parameters(len(points)), metric=metric)
+    return path_curvature(points, closed=closed, metric=metric)
 
 
 def find_apex_points(points, curvature_vals, threshold=0.001):
@@ -71,52 +66,71 @@ def find_apex_points(points, curvature_vals, threshold=0.001):
     return apex_indices
 
 
-def cluster_apex_points(points, apex_indices, dist_threshold=0.0005):
+def cluster_apex_points(points, apex_indices, dist_threshold=50.0, method='kdtree', closed=True):
+    apex_indices = np.asarray(apex_indices, dtype=int)
     apex_points = points[apex_indices]
-    dist_mat = cdist(apex_points, apex_points)
-
     n = len(apex_points)
-    visited = set()
-    clusters = []
-
-    for i in range(n):
-        if i in visited:
-            continue
-        cluster = {i}
-        stack = [i]
-        while stack:
-            curr = stack.pop()
-            neighbors = np.where(dist_mat[curr] < dist_threshold)[0]
-            for nb in neighbors:
-                if nb not in cluster:
-                    cluster.add(nb)
-                    stack.append(nb)
-        visited.update(cluster)
-        clusters.append(list(cluster))
-
-    return clusters
+    if n == 0:
+        return []
+
+    if method == 'sweep':
+        # Apexes lie in track order: a new cluster starts wherever the gap to
+        # the previous apex reaches the threshold
+        order = np.argsort(apex_indices, kind='stable')
+        ordered = apex_points[order]
+        gaps = np.linalg.norm(np.diff(ordered, axis=0), axis=1)
+        sorted_labels = np.concatenate([[0], np.cumsum(gaps >= dist_threshold)])
+
+        # Join the last and first clusters across the start/finish seam
+        if closed and sorted_labels[-1] > 0 and np.linalg.norm(ordered[-1] - ordered[0]) < dist_threshold:
+            sorted_labels[sorted_labels == sorted_labels[-1]] = 0
+
+        labels = np.empty(n, dtype=int)
+        labels[order] = sorted_labels
+    elif method == 'kdtree':
+        # Connected components of the "closer than threshold" graph
+        pairs = cKDTree(apex_points).query_pairs(dist_threshold, output_type='ndarray')
+        pair_dist = np.linalg.norm(apex_points[pairs[:, 0]] - apex_points[pairs[:, 1]], axis=1)
+        pairs = pairs[pair_dist < dist_threshold]
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+    else:
+        raise ValueError(f"Unknown clustering method: {method}")
+
+    # Order clusters by their first member, members ascending
+    _, first_member = np.unique(labels, return_index=True)
+    cluster_rank = np.empty(labels.max() + 1, dtype=int)
+    cluster_rank[labels[first_member]] = np.argsort(np.argsort(first_member))
+    ranked = cluster_rank[labels]
+    members = np.argsort(ranked, kind='stable')
+    sizes = np.bincount(ranked)
+    return [cluster.tolist() for cluster in np.split(members, np.cumsum(sizes)[:-1])]
 
 
 def filter_clusters_by_curvature(points, apex_indices, curvature_vals, clusters):
-    filtered_apex = []
-    for cluster in clusters:
-        cluster_curvatures = [abs(curvature_vals[apex_indices[i]]) for i in cluster]
-        max_idx_in_cluster = cluster[np.argmax(cluster_curvatures)]
-        filtered_apex.append(apex_indices[max_idx_in_cluster])
-    return filtered_apex
+    if len(clusters) == 0:
+        return []
+    apex_indices = np.asarray(apex_indices, dtype=int)
 
+    members = np.concatenate([np.asarray(cluster, dtype=int) for cluster in clusters])
+    labels = np.repeat(np.arange(len(clusters)), [len(cluster) for cluster in clusters])
+    strength = np.abs(curvature_vals[apex_indices[members]])
 
-def find_opposite_track_points(source_points, target_points, source_apex_indices, max_distance=0.001):
-    source_apex = source_points[source_apex_indices]
-    dist_matrix = cdist(source_apex, target_points)
+    # Group argmax: sort by cluster, then strongest curvature first, then cluster order for ties
+    order = np.lexsort((np.arange(len(members)), -strength, labels))
+    first_in_cluster = np.concatenate([[True], labels[order][1:] != labels[order][:-1]])
+    return apex_indices[members[order[first_in_cluster]]].tolist()
 
-    opposite_indices = []
-    for i in range(len(source_apex_indices)):
-        min_dist_idx = np.argmin(dist_matrix[i])
-        if dist_matrix[i, min_dist_idx] < max_distance:
-            opposite_indices.append(min_dist_idx)
 
-    return opposite_indices
+def find_opposite_track_points(source_points, target_points, source_apex_indices, max_distance=100.0,
+                               target_index=None):
+    if target_index is None:
+        target_index = TrackIndex(target_points)
+
+    source_apex = source_points[source_apex_indices]
+    _, nearest = target_index.nearest(source_apex, max_distance=max_distance)
+
+    return nearest[nearest >= 0].tolist()
 
 
 def get_turn_direction(points, apex_indices):
@@ -136,20 +150,19 @@ def get_turn_direction(points, apex_indices):
 
 def select_apex_based_on_turn_direction(inner_points, outer_points,
                                         inner_apex_indices, outer_apex_indices,
-                                        k_inner, k_outer, max_pairing_distance=0.001):
+                                        k_inner, k_outer, max_pairing_distance=100.0):
     inner_apex_pts = inner_points[inner_apex_indices]
     outer_apex_pts = outer_points[outer_apex_indices]
 
     inner_turn_dirs = get_turn_direction(inner_points, inner_apex_indices)
     outer_turn_dirs = get_turn_direction(outer_points, outer_apex_indices)
 
-    dist_matrix = cdist(inner_apex_pts, outer_apex_pts)
+    _, nearest = TrackIndex(outer_apex_pts).nearest(inner_apex_pts, max_distance=max_pairing_distance)
     valid_pairs = []
 
     for i, inner_idx in enumerate(inner_apex_indices):
-        closest_outer_idx = outer_apex_indices[np.argmin(dist_matrix[i])]
-        if dist_matrix[i, np.argmin(dist_matrix[i])] < max_pairing_distance:
-            valid_pairs.append((inner_idx, closest_outer_idx, inner_turn_dirs[i]))
+        if nearest[i] >= 0:
+            valid_pairs.append((inner_idx, outer_apex_indices[nearest[i]], inner_turn_dirs[i]))
 
     final_inner_apex = []
     final_outer_apex = []
@@ -204,49 +217,69 @@ def save_apex_points_to_csv(inner_points, outer_points, inner_apex_indices, oute
     print(f"Apex points saved to {filename}")
 
 
-if __name__ == "__main__":
-    # Configuration
-    csv_file = 'track_paths.csv'
-    resample_points = 2000
-    curvature_threshold = 0.002
-    cluster_threshold = 0.0005
-    pairing_distance = 0.001
-
-    # Load and process data
-    inner, outer = parse_csv_coordinates(csv_file)
-    inner_rs = resample_curve(inner, n_points=resample_points)
-    outer_rs = resample_curve(outer, n_points=resample_points)
-
-    # Calculate curvature
-    k_inner = curvature(inner_rs)
-    k_outer = curvature(outer_rs)
-
-    # Find initial apex points
+def detect_apexes(inner_rs, outer_rs, k_inner, k_outer, curvature_threshold=0.001,
+                  cluster_threshold=50.0, pairing_distance=100.0):
+    # Track frame points (metres) and curvature (1/m); find initial apex points
     apex_inner = find_apex_points(inner_rs, k_inner, threshold=curvature_threshold)
     apex_outer = find_apex_points(outer_rs, k_outer, threshold=curvature_threshold)
 
     # Cluster nearby apex points
-    clusters_inner = cluster_apex_points(inner_rs, apex_inner, dist_threshold=cluster_threshold)
-    clusters_outer = cluster_apex_points(outer_rs, apex_outer, dist_threshold=cluster_threshold)
+    clusters_inner = cluster_apex_points(inner_rs, apex_inner, dist_threshold=cluster_threshold, method='sweep')
+    clusters_outer = cluster_apex_points(outer_rs, apex_outer, dist_threshold=cluster_threshold, method='sweep')
 
     # Filter clusters to keep strongest apex in each
     filtered_inner = filter_clusters_by_curvature(inner_rs, apex_inner, k_inner, clusters_inner)
     filtered_outer = filter_clusters_by_curvature(outer_rs, apex_outer, k_outer, clusters_outer)
 
-    # Find apex points on opposite tracks
-    inner_apex_from_outer = find_opposite_track_points(outer_rs, inner_rs, filtered_outer, pairing_distance)
-    outer_apex_from_inner = find_opposite_track_points(inner_rs, outer_rs, filtered_inner, pairing_distance)
+    # Find apex points on opposite tracks, reusing one spatial index per boundary
+    inner_index = TrackIndex(inner_rs)
+    outer_index = TrackIndex(outer_rs)
+    inner_apex_from_outer = find_opposite_track_points(outer_rs, inner_rs, filtered_outer, pairing_distance,
+                                                       target_index=inner_index)
+    outer_apex_from_inner = find_opposite_track_points(inner_rs, outer_rs, filtered_inner, pairing_distance,
+                                                       target_index=outer_index)
 
     # Apply turn direction logic to final selection
-    final_inner_apex, final_outer_apex = select_apex_based_on_turn_direction(
+    return select_apex_based_on_turn_direction(
         inner_rs, outer_rs, inner_apex_from_outer, outer_apex_from_inner,
         k_inner, k_outer, max_pairing_distance=pairing_distance
     )
 
+
+if __name__ == "__main__":
+    # Configuration
+    csv_file = 'track_paths.csv'
+    resample_spacing = 5.0  # m
+    curvature_threshold = 0.001  # 1/m
+    cluster_threshold = 50.0  # m
+    pairing_distance = 100.0  # m
+
+    # Load data and project it into the track frame, so everything below is in metres
+    inner, outer = parse_csv_coordinates(csv_file)
+    frame = track_frame(outer)
+    inner_curve = TrackCurve(frame.forward(inner))
+    outer_curve = TrackCurve(frame.forward(outer))
+    resample_points = int(np.ceil(max(inner_curve.length, outer_curve.length) / resample_spacing))
+    inner_rs = resample_curve(inner, n_points=resample_points, curve=inner_curve)
+    outer_rs = resample_curve(outer, n_points=resample_points, curve=outer_curve)
+
+    # Calculate curvature analytically from the fitted splines
+    k_inner = curvature(inner_rs, curve=inner_curve)
+    k_outer = curvature(outer_rs, curve=outer_curve)
+
+    # Detect apexes and keep the one on the correct side of each turn
+    final_inner_apex, final_outer_apex = detect_apexes(
+        inner_rs, outer_rs, k_inner, k_outer,
+        curvature_threshold=curvature_threshold,
+        cluster_threshold=cluster_threshold,
+        pairing_distance=pairing_distance
+    )
+
     # Output results
     print(f"Final inner apex count: {len(final_inner_apex)}")
     print(f"Final outer apex count: {len(final_outer_apex)}")
 
-    # Save and visualize
+    # Save and visualize in lon/lat
+    inner_rs, outer_rs = frame.inverse(inner_rs), frame.inverse(outer_rs)
     save_apex_points_to_csv(inner_rs, outer_rs, final_inner_apex, final_outer_apex)
-    plot_track_with_apex(inner_rs, outer_rs, final_inner_apex, final_outer_apex)
\ No newline at end of file
+    plot_track_with_apex(inner_rs, outer_rs, final_inner_apex, final_outer_apex)
@@ -0,0 +1,188 @@
+import os
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+GOOGLE_ELEVATION_URL = "https://maps.googleapis.com/maps/api/elevation/json"
+
+
+class ElevationProvider(ABC):
+    """
+    Source of ground elevation. elevations() takes an [N, 2] lon/lat array
+    and returns N heights in metres (NaN where the source has no data).
+    """
+
+    @abstractmethod
+    def elevations(self, points):
+        pass
+
+
+class GridElevation(ElevationProvider):
+    """
+    Bilinear interpolation in a regular lon/lat height grid (rows = lat),
+    vectorized over all points. Load one from a pre-fetched .npz grid or
+    a north-up GeoTIFF DEM in geographic coordinates.
+    """
+
+    def __init__(self, lon, lat, heights):
+        lon, lat, heights = np.asarray(lon, float), np.asarray(lat, float), np.asarray(heights, float)
+        if lat[0] > lat[-1]:
+            lat, heights = lat[::-1], heights[::-1]
+        if lon[0] > lon[-1]:
+            lon, heights = lon[::-1], heights[:, ::-1]
+        self.lon, self.lat, self.heights = lon, lat, heights
+
+    @classmethod
+    def from_file(cls, path):
+        if path.lower().endswith(('.tif', '.tiff')):
+            return cls.from_geotiff(path)
+        with np.load(path) as data:
+            return cls(data['lon'], data['lat'], data['elevation'])
+
+    @classmethod
+    def from_geotiff(cls, path):
+        import rasterio  # Optional dependency, only needed for GeoTIFF DEMs
+
+        with rasterio.open(path) as src:
+            t = src.transform
+            if t.b or t.d:
+                raise ValueError(f"{path} is rotated; only north-up DEMs are supported")
+            heights = src.read(1).astype(float)
+            if src.nodata is not None:
+                heights[heights == src.nodata] = np.nan
+            lon = t.c + (np.arange(src.width) + 0.5) * t.a
+            lat = t.f + (np.arange(src.height) + 0.5) * t.e
+        return cls(lon, lat, heights)
+
+    def save(self, path):
+        np.savez_compressed(path, lon=self.lon, lat=self.lat, elevation=self.heights)
+
+    def elevations(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        fx = (points[:, 0] - self.lon[0]) / (self.lon[-1] - self.lon[0]) * (len(self.lon) - 1)
+        fy = (points[:, 1] - self.lat[0]) / (self.lat[-1] - self.lat[0]) * (len(self.lat) - 1)
+        i = np.clip(np.floor(fx).astype(int), 0, len(self.lon) - 2)
+        j = np.clip(np.floor(fy).astype(int), 0, len(self.lat) - 2)
+        tx, ty = fx - i, fy - j
+
+        h = self.heights
+        result = ((1 - tx) * (1 - ty) * h[j, i] + tx * (1 - ty) * h[j, i + 1]
+                  + (1 - tx) * ty * h[j + 1, i] + tx * ty * h[j + 1, i + 1])
+        outside = (fx < 0) | (fx > len(self.lon) - 1) | (fy < 0) | (fy > len(self.lat) - 1)
+        result[outside] = np.nan
+        return result
+
+
+class GoogleElevation(ElevationProvider):
+    """
+    Google Elevation API client. Points are sent in batches of batch_size,
+    up to concurrency requests at a time (asyncio over worker threads),
+    and failed batches are retried with exponential backoff.
+    """
+
+    def __init__(self, api_key, url=GOOGLE_ELEVATION_URL, batch_size=256, concurrency=8, retries=3,
+                 timeout=10.0):
+        if not api_key:
+            raise ValueError("An API key is required for the Google Elevation API")
+        self.api_key = api_key
+        self.url = url
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+
+    def _fetch_batch(self, batch):
+        import requests
+
+        locations = "|".join(f"{lat:.7f},{lon:.7f}" for lon, lat in batch)
+        for attempt in range(self.retries + 1):
+            try:
+                response = requests.get(self.url, params={"locations": locations, "key": self.api_key},
+                                        timeout=self.timeout)
+                response.raise_for_status()
+                payload = response.json()
+                if payload.get("status") != "OK":
+                    raise RuntimeError(f"Elevation API returned {payload.get('status')}: "
+                                       f"{payload.get('error_message', '')}")
+                return [result["elevation"] for result in payload["results"]]
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    async def elevations_async(self, points):
+        import asyncio
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(batch):
+            async with semaphore:
+                return await asyncio.to_thread(self._fetch_batch, batch)
+
+        batches = [points[i:i + self.batch_size] for i in range(0, len(points), self.batch_size)]
+        results = await asyncio.gather(*(fetch(batch) for batch in batches))
+        return np.array([h for batch in results for h in batch], dtype=float)
+
+    def elevations(self, points):
+        import asyncio
+
+        return asyncio.run(self.elevations_async(points))
+
+
+class CachedElevation(ElevationProvider):
+    """
+    Persistent cache in front of another provider, keyed by coordinates
+    rounded to decimals places (5 decimals is about a metre). Only points
+    missing from the cache are requested, once each, and the cache file is
+    rewritten after every lookup that added heights. Points the provider
+    has no height for are cached as NaN, so they are not requested again.
+    """
+
+    def __init__(self, provider, path, decimals=5):
+        self.provider = provider
+        self.path = path
+        self.decimals = decimals
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.heights = np.empty(0)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if int(data['decimals']) == decimals:
+                    self.keys, self.heights = data['keys'], data['heights']
+
+    def _keys(self, points):
+        # One uint64 per rounded (lon, lat) pair: 32 bits each, offset to be non-negative
+        scaled = (np.rint(points * 10 ** self.decimals).astype(np.int64) + 2 ** 31).astype(np.uint64)
+        return scaled[:, 0] << np.uint64(32) | scaled[:, 1]
+
+    def _lookup(self, keys):
+        pos = np.clip(np.searchsorted(self.keys, keys), 0, max(len(self.keys) - 1, 0))
+        found = (self.keys[pos] == keys) if len(self.keys) else np.zeros(len(keys), dtype=bool)
+        return pos, found
+
+    def elevations(self, points):
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        keys = self._keys(points)
+        pos, found = self._lookup(keys)
+
+        if not found.all():
+            missing_keys, first = np.unique(keys[~found], return_index=True)
+            heights = np.asarray(self.provider.elevations(points[~found][first]), dtype=float)
+            heights[~np.isfinite(heights)] = np.nan
+            self.keys = np.concatenate([self.keys, missing_keys])
+            self.heights = np.concatenate([self.heights, heights])
+            order = np.argsort(self.keys)
+            self.keys, self.heights = self.keys[order], self.heights[order]
+            self.save()
+            pos, found = self._lookup(keys)
+
+        result = np.full(len(points), np.nan)
+        result[found] = self.heights[pos[found]]
+        return result
+
+    def save(self):
+        # Write then rename, so an interrupted run never leaves a truncated cache
+        tmp_path = f'{self.path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, decimals=self.decimals, keys=self.keys, heights=self.heights)
+        os.replace(tmp_path, self.path)
@@ -1,13 +1,21 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import csv
-from scipy.spatial.distance import cdist
 from matplotlib.collections import LineCollection
-from scipy.signal import savgol_filter
+from spatial_index import TrackIndex
+from track_curve import path_curvature
+from speed_profile import GRAVITY, path_speed_profile
+from track_store import is_track_store, load_track
+from result_cache import shared_cache
+from track_frame import track_frame
 
 
 def load_track_data(csv_file):
 
+    if is_track_store(csv_file):
+        track = load_track(csv_file, ['inner', 'outer', 'center'])
+        return track['inner'], track['outer'], track['center']
+
     inner_points, outer_points, center_points = [], [], []
     with open(csv_file, 'r') as file:
         reader = csv.DictReader(file)
@@ -23,6 +31,13 @@ def load_track_data(csv_file):
 
 def load_apex_points(csv_file):
 
+    if is_track_store(csv_file):
+        track = load_track(csv_file, ['apex', 'apex_curvature'])
+        if track['apex'] is None:
+            return []
+        curvatures = track['apex_curvature'] if track['apex_curvature'] is not None else np.ones(len(track['apex']))
+        return [{'point': point, 'curvature': float(k)} for point, k in zip(track['apex'], curvatures)]
+
     apex_points = []
     with open(csv_file, 'r') as file:
         reader = csv.DictReader(file)
@@ -37,29 +52,56 @@ def load_apex_points(csv_file):
     return apex_points
 
 
-def calculate_turn_sharpness(center_line, window=10):
-
-    sharpness = np.zeros(len(center_line))
-    for i in range(len(center_line)):
-        start = max(0, i - window)
-        end = min(len(center_line) - 1, i + window)
-        segment = center_line[start:end]
-
-        # Calculate direction changes
-        directions = np.arctan2(
-            np.gradient(segment[:, 1]),
-            np.gradient(segment[:, 0])
-        )
-        sharpness[i] = np.sum(np.abs(np.diff(directions)))
-    return sharpness / np.max(sharpness)  # Normalize to 0-1
-
-
-def find_closest_center_points(center_line, apex_data):
-
+def calculate_turn_sharpness(center_line, window=10, closed=False):
+
+    n = len(center_line)
+    if closed and n > 1 and np.allclose(center_line[0], center_line[-1]):
+        # Explicitly closed loop: drop the repeated start point and copy its value back
+        sharpness = calculate_turn_sharpness(center_line[:-1], window, closed=True)
+        return np.append(sharpness, sharpness[0])
+
+    # Heading of the whole line in one pass
+    if closed:
+        tangent = np.roll(center_line, -1, axis=0) - np.roll(center_line, 1, axis=0)
+    else:
+        tangent = np.column_stack([np.gradient(center_line[:, 0]), np.gradient(center_line[:, 1])])
+    directions = np.arctan2(tangent[:, 1], tangent[:, 0])
+
+    # Absolute heading change per step, wrapped to [-pi, pi) so crossing +-pi is not a full turn
+    if closed:
+        steps = np.roll(directions, -1) - directions
+    else:
+        steps = np.diff(directions)
+    turning = np.abs((steps + np.pi) % (2 * np.pi) - np.pi)
+
+    # Total turning over steps [i - window, i + window - 1) via a cumulative sum
+    idx = np.arange(n)
+    if closed:
+        # Wrap window steps onto both ends (np.take wraps repeatedly, so short loops with n <= window work too)
+        turning = np.take(turning, np.arange(-window, n + window), mode='wrap')
+        start = idx
+        end = idx + 2 * window - 1
+    else:
+        start = np.maximum(0, idx - window)
+        end = np.maximum(start, np.minimum(n - 1, idx + window) - 1)
+    prefix = np.concatenate([[0.0], np.cumsum(turning)])
+    sharpness = prefix[end] - prefix[start]
+
+    max_sharpness = np.max(sharpness)
+    if max_sharpness == 0:
+        return sharpness
+    return sharpness / max_sharpness  # Normalize to 0-1
+
+
+def find_closest_center_points(center_line, apex_data, center_index=None):
+
+    if center_index is None:
+        center_index = TrackIndex(center_line)
+
+    # One batched KD-tree query for all apexes
+    _, closest = center_index.nearest([apex['point'] for apex in apex_data])
     apex_indices = []
-    for apex in apex_data:
-        distances = cdist([apex['point']], center_line)
-        closest_idx = np.argmin(distances)
+    for apex, closest_idx in zip(apex_data, closest):
         apex_indices.append({
             'index': closest_idx,
             'sharpness': apex['curvature'],
@@ -71,98 +113,109 @@ def find_closest_center_points(center_line, apex_data):
     return apex_indices
 
 
-def create_adaptive_path(center_line, apex_info, base_influence=30, max_deviation=0.5):
+def blend_toward_apexes(path, apex_info, base_influence=30, max_deviation=0.5):
 
-    path = center_line.copy()
-    sharpness_map = calculate_turn_sharpness(center_line)
+    n = len(path)
+    if len(apex_info) == 0:
+        return path.copy()
 
-    for apex in apex_info:
-        apex_idx = apex['index']
-        apex_sharpness = apex['sharpness']
-        apex_point = apex['point']
+    apex_idx = np.array([apex['index'] for apex in apex_info], dtype=int)
+    apex_sharpness = np.array([apex['sharpness'] for apex in apex_info], dtype=float)
+    apex_points = np.array([apex['point'] for apex in apex_info], dtype=float)
 
-        # Dynamic parameters based on sharpness
-        influence_radius = int(base_influence * (1 + apex_sharpness))
-        deviation_strength = max_deviation * apex_sharpness
+    # Dynamic parameters based on sharpness
+    influence_radius = (base_influence * (1 + apex_sharpness)).astype(int)
+    deviation_strength = max_deviation * apex_sharpness
 
-        start_idx = max(0, apex_idx - influence_radius)
-        end_idx = min(len(center_line) - 1, apex_idx + influence_radius)
+    start_idx = np.maximum(0, apex_idx - influence_radius)
+    end_idx = np.minimum(n - 1, apex_idx + influence_radius)
+    lengths = end_idx - start_idx
 
-        # Bell curve weighted by sharpness
-        x = np.linspace(-3, 3, end_idx - start_idx)
-        weights = np.exp(-x ** 2) * deviation_strength
+    # Flatten every apex window into one (apex, path index, weight) table
+    owner = np.repeat(np.arange(len(apex_info)), lengths)
+    offset = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    indices = start_idx[owner] + offset
 
-        # Blend path toward apex point
-        for i, idx in enumerate(range(start_idx, end_idx)):
-            path[idx] = (1 - weights[i]) * path[idx] + weights[i] * apex_point
+    # Bell curve weighted by sharpness (same samples as np.linspace(-3, 3, length))
+    span = np.maximum(lengths[owner] - 1, 1)
+    x = -3 + 6 * offset / span
+    weights = np.exp(-x ** 2) * deviation_strength[owner]
 
-    # Apply curvature-adaptive smoothing
-    smoothed_path = path.copy()
-    for i in range(len(path)):
-        window = max(3, int(10 * (1 - sharpness_map[i])))
-        start = max(0, i - window)
-        end = min(len(path), i + window + 1)
-        smoothed_path[i] = np.mean(path[start:end], axis=0)
+    # Overlapping windows blend sequentially in apex order, so apply the
+    # table in layers where each path index appears at most once
+    order = np.argsort(indices, kind='stable')
+    sorted_indices = indices[order]
+    group_start = np.searchsorted(sorted_indices, sorted_indices, side='left')
+    layer = np.empty_like(order)
+    layer[order] = np.arange(len(order)) - group_start
 
-    return smoothed_path
+    blended = path.copy()
+    for depth in range(layer.max() + 1 if len(layer) else 0):
+        sel = layer == depth
+        idx, w = indices[sel], weights[sel, None]
+        blended[idx] = (1 - w) * blended[idx] + w * apex_points[owner[sel]]
+    return blended
 
 
-def create_waveform_data():
+def adaptive_moving_average(path, sharpness_map):
 
-    # Hardcoded velocity percentages for each turn
-    turns = ['Turn 1', 'Turn 2', 'Turn 3', 'Turn 4', 'Turn 5',
-             'Turn 6', 'Turn 7', 'Turn 8', 'Turn 9', 'Turn 10']
-    velocity_percent = [20, 70, 80, 50, 60, 70, 40, 40, 20, 40]
+    n = len(path)
+    window = np.maximum(3, (10 * (1 - sharpness_map)).astype(int))
+    start = np.maximum(0, np.arange(n) - window)
+    end = np.minimum(n, np.arange(n) + window + 1)
 
-    # Create smooth waveform for velocity
-    x = np.arange(len(turns))
-    x_interp = np.linspace(0, len(turns) - 1, 500)
-    v_interp = np.interp(x_interp, x, velocity_percent)
-    v_smooth = savgol_filter(v_interp, window_length=51, polyorder=3)
+    # Prefix sums around a reference point keep cancellation error small
+    reference = path.mean(axis=0)
+    prefix = np.zeros((n + 1, path.shape[1]))
+    np.cumsum(path - reference, axis=0, out=prefix[1:])
+    return (prefix[end] - prefix[start]) / (end - start)[:, None] + reference
 
-    # Calculate acceleration between turns (for bar chart)
-    acceleration = np.diff(velocity_percent)
-    acceleration = np.append(acceleration, 0)  # Pad with 0
 
-    return x_interp, v_smooth, x, velocity_percent, acceleration, turns
+def create_adaptive_path(center_line, apex_info, base_influence=30, max_deviation=0.5, closed=False):
 
+    sharpness_map = calculate_turn_sharpness(center_line, closed=closed)
 
-def plot_combined_profiles():
+    # Blend path toward apex points
+    path = blend_toward_apexes(center_line, apex_info, base_influence, max_deviation)
 
-    x_wave, velocity, x_bar, velocity_points, acceleration, turns = create_waveform_data()
+    # Apply curvature-adaptive smoothing
+    return adaptive_moving_average(path, sharpness_map)
+
+
+def plot_combined_profiles(profile, apex_info=()):
+
+    distance = profile['distance']
+    speed_kmh = profile['speed'] * 3.6
+    accel_g = profile['acceleration'] / GRAVITY
+    accel_distance = distance[:len(accel_g)]
 
     # Create figure with two subplots
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
 
-    # Plot velocity waveform (ECG-style)
-    ax1.plot(x_wave, velocity, 'b-', linewidth=2, label='Velocity')
-    ax1.scatter(x_bar, velocity_points, color='blue', s=100, zorder=3, label='Turn Points')
+    # Plot velocity trace against the cornering limit
+    ax1.plot(distance, np.minimum(profile['speed_limit'], profile['speed'].max()) * 3.6,
+             color='gray', linestyle='--', alpha=0.6, label='Cornering Limit')
+    ax1.plot(distance, speed_kmh, 'b-', linewidth=2, label='Velocity')
 
-    # Add turn labels and markers
-    for i, turn in enumerate(turns):
-        ax1.axvline(x=i, color='gray', linestyle=':', alpha=0.5)
-        ax1.text(i, 105, turn, ha='center', va='bottom', fontsize=10)
+    # Add turn labels and markers at the apexes
+    for i, apex in enumerate(apex_info):
+        apex_distance = distance[min(apex['index'], len(distance) - 1)]
+        ax1.axvline(x=apex_distance, color='gray', linestyle=':', alpha=0.5)
+        ax1.text(apex_distance, speed_kmh.max() * 1.02, f'Turn {i + 1}', ha='center', va='bottom', fontsize=10)
 
-    ax1.set_title('Velocity Profile (ECG-style)', fontsize=14)
-    ax1.set_ylabel('Speed (% of max)', fontsize=12)
-    ax1.set_ylim(0, 110)
+    ax1.set_title(f"Velocity Profile (lap time {profile['lap_time']:.2f} s)", fontsize=14)
+    ax1.set_ylabel('Speed (km/h)', fontsize=12)
+    ax1.set_ylim(0, speed_kmh.max() * 1.12)
     ax1.grid(True, linestyle='--', alpha=0.7)
     ax1.legend()
 
-    # Plot acceleration bar chart
-    colors = ['green' if a >= 0 else 'red' for a in acceleration]
-    bars = ax2.bar(turns, acceleration, color=colors, alpha=0.7)
+    # Plot longitudinal acceleration, green when accelerating and red when braking
+    ax2.fill_between(accel_distance, accel_g, 0, where=accel_g >= 0, color='green', alpha=0.7, step='post')
+    ax2.fill_between(accel_distance, accel_g, 0, where=accel_g < 0, color='red', alpha=0.7, step='post')
 
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width() / 2., height,
-                 f'{int(height)}%',
-                 ha='center', va='bottom' if height >= 0 else 'top')
-
-    ax2.set_title('Acceleration Profile (Bar Chart)', fontsize=14)
-    ax2.set_xlabel('Track Position', fontsize=12)
-    ax2.set_ylabel('Acceleration (% change)', fontsize=12)
+    ax2.set_title('Acceleration Profile', fontsize=14)
+    ax2.set_xlabel('Distance (m)', fontsize=12)
+    ax2.set_ylabel('Longitudinal Acceleration (g)', fontsize=12)
     ax2.grid(True, axis='y', linestyle='--', alpha=0.7)
     ax2.axhline(0, color='black', linewidth=0.5)
 
@@ -178,12 +231,8 @@ def plot_optimal_racing_line(inner, outer, center, apex_data, optimal_path):
     ax.plot(inner[:, 0], inner[:, 1], 'g-', alpha=0.4, label='Inner Boundary')
     ax.plot(outer[:, 0], outer[:, 1], 'b-', alpha=0.4, label='Outer Boundary')
 
-    # Calculate curvature
-    dx = np.gradient(optimal_path[:, 0])
-    dy = np.gradient(optimal_path[:, 1])
-    ddx = np.gradient(dx)
-    ddy = np.gradient(dy)
-    curvature = np.abs(dx * ddy - dy * ddx) / (dx ** 2 + dy ** 2) ** 1.5
+    # Calculate curvature (1/m) from a spline through the racing line
+    curvature = np.abs(path_curvature(optimal_path, closed=True, metric=True))
 
     # Create line segments colored by curvature
     points = np.array([optimal_path[:-1], optimal_path[1:]]).transpose(1, 0, 2)
@@ -196,7 +245,7 @@ def plot_optimal_racing_line(inner, outer, center, apex_data, optimal_path):
     line = ax.add_collection(lc)
 
     # Add colorbar
-    cbar = fig.colorbar(line, ax=ax, label='Curvature Intensity')
+    cbar = fig.colorbar(line, ax=ax, label='Curvature (1/m)')
 
     # Mark apex points
     for i, apex in enumerate(apex_data):
@@ -219,18 +268,36 @@ def main():
     inner, outer, center = load_track_data('track_paths.csv')
     apex_data = load_apex_points('apex_points.csv')
 
-    # Process apexes
-    apex_info = find_closest_center_points(center, apex_data)
+    # Work in track frame metres, so headings, nearest apexes and smoothing are not distorted by latitude
+    frame = track_frame(outer)
+    center_m = frame.forward(center)
+    apex_data_m = [{**apex, 'point': frame.forward(apex['point'])} for apex in apex_data]
 
-    # Generate adaptive racing line
-    optimal_path = create_adaptive_path(center, apex_info,
-                                        base_influence=30, max_deviation=0.6)
+    # Process apexes
+    apex_info_m = find_closest_center_points(center_m, apex_data_m)
+    apex_info = [{**apex, 'point': frame.inverse(apex['point'])} for apex in apex_info_m]
+
+    # Generate adaptive racing line, cached by the track and apex geometry and the parameters
+    cache = shared_cache()
+    apex_geometry = (np.array([apex['point'] for apex in apex_info_m]).reshape(-1, 2),
+                     np.array([apex['sharpness'] for apex in apex_info_m], dtype=float))
+    path_params = {'base_influence': 30, 'max_deviation': 0.6}
+    optimal_path_m = cache.memoize('adaptive_path',
+                                   lambda: create_adaptive_path(center_m, apex_info_m, **path_params),
+                                   (center_m, *apex_geometry), path_params)
+    optimal_path = frame.inverse(optimal_path_m)
 
     # Visualize optimal racing line
     plot_optimal_racing_line(inner, outer, center, apex_info, optimal_path)
 
+    # Speed profile along the computed line (uniform friction)
+    profile = cache.memoize('speed_profile',
+                            lambda: path_speed_profile(optimal_path_m, friction=1.0, metric=True),
+                            (optimal_path_m,), {'friction': 1.0, 'metric': True})
+    print(f"Estimated lap time: {profile['lap_time']:.2f} s")
+
     # After closing the racing line plot, show combined profiles
-    plot_combined_profiles()
+    plot_combined_profiles(profile, apex_info)
 
     # Save results
     np.savetxt('adaptive_racing_line.csv', optimal_path,
@@ -0,0 +1,143 @@
+import numpy as np
+
+# Brush weight as a function of distance / radius (0 at the centre, 1 at the edge)
+FALLOFFS = {
+    'hard': lambda t: np.ones_like(t),
+    'linear': lambda t: 1 - t,
+    'smooth': lambda t: 1 - t * t * (3 - 2 * t),
+}
+
+
+class FrictionBrush:
+    """
+    Circular brush that paints friction values into a grid in place.
+
+    Every stamp only touches the window of cells the disk can reach, sized
+    from the radius and the grid spacing, and only cells inside the track
+    mask. A stroke (press, drag, release) is recorded as one sparse diff
+    (changed cell indices with their old and new values) on an undo stack.
+    grid is modified in place; x and y are the cell centre coordinates of
+    its columns and rows. scale converts grid units along x and y to the
+    units of radius (e.g. metres_per_degree for a lon/lat grid and a radius
+    in metres), so the brush stays circular on the ground.
+    """
+
+    def __init__(self, grid, mask, x, y, radius, falloff='hard', strength=1.0, max_undo=50, scale=(1.0, 1.0)):
+        self.grid = grid
+        self.mask = mask
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.radius = radius
+        self.scale = np.asarray(scale, dtype=float)
+        self.falloff = falloff
+        self.strength = strength
+        self.max_undo = max_undo
+        self.undo_stack = []
+        self.redo_stack = []
+        self._stroke = None
+        self._last_point = None
+
+    def _window(self, x, y):
+        # Row and column slices of the cells whose centres can fall inside the disk
+        rx, ry = self.radius / self.scale
+        r0 = np.searchsorted(self.y, y - ry, side='left')
+        r1 = np.searchsorted(self.y, y + ry, side='right')
+        c0 = np.searchsorted(self.x, x - rx, side='left')
+        c1 = np.searchsorted(self.x, x + rx, side='right')
+        return slice(r0, r1), slice(c0, c1)
+
+    def stamp(self, x, y, value):
+        """
+        Paint one disk centred on (x, y). Returns the (rows, columns) slices
+        of the changed window, or None if no cell changed.
+        """
+        rows, cols = self._window(x, y)
+        if rows.start >= rows.stop or cols.start >= cols.stop:
+            return None
+
+        dy = (self.y[rows] - y)[:, None] * self.scale[1]
+        dx = (self.x[cols] - x) * self.scale[0]
+        t = np.hypot(dx, dy) / self.radius
+        inside = (t <= 1) & self.mask[rows, cols]
+        if not inside.any():
+            return None
+
+        window = self.grid[rows, cols]
+        weight = self.strength * FALLOFFS[self.falloff](np.minimum(t, 1))[inside]
+        old = window[inside]
+        window[inside] = old + weight * (value - old)
+
+        if self._stroke is not None:
+            r, c = np.nonzero(inside)
+            flat = (r + rows.start) * self.grid.shape[1] + c + cols.start
+            self._stroke.append((flat, old))
+        return rows, cols
+
+    @property
+    def in_stroke(self):
+        return self._stroke is not None
+
+    def begin_stroke(self):
+        self._stroke = []
+        self._last_point = None
+
+    def drag(self, x, y, value):
+        """
+        Continue the current stroke to (x, y), stamping every half radius
+        along the way so fast mouse moves leave no gaps. Returns the
+        bounding (rows, columns) slices of the changed cells, or None.
+        """
+        if self._last_point is None:
+            points = [(x, y)]
+        else:
+            x0, y0 = self._last_point
+            distance = np.hypot((x - x0) * self.scale[0], (y - y0) * self.scale[1])
+            steps = max(1, int(np.ceil(distance / (self.radius / 2))))
+            s = np.arange(1, steps + 1) / steps
+            points = zip(x0 + s * (x - x0), y0 + s * (y - y0))
+        self._last_point = (x, y)
+
+        changed = [window for window in (self.stamp(px, py, value) for px, py in points) if window]
+        if not changed:
+            return None
+        return (slice(min(r.start for r, _ in changed), max(r.stop for r, _ in changed)),
+                slice(min(c.start for _, c in changed), max(c.stop for _, c in changed)))
+
+    def end_stroke(self):
+        # Merge the stroke's stamps into one diff, keeping each cell's value from before the stroke.
+        # Returns the number of cells the stroke changed.
+        stroke, self._stroke, self._last_point = self._stroke, None, None
+        if not stroke:
+            return 0
+        flat = np.concatenate([f for f, _ in stroke])
+        old = np.concatenate([o for _, o in stroke])
+        flat, first = np.unique(flat, return_index=True)
+        self._push(self.undo_stack, (flat, old[first], self.grid.flat[flat]))
+        self.redo_stack.clear()
+        return len(flat)
+
+    def _push(self, stack, diff):
+        stack.append(diff)
+        if len(stack) > self.max_undo:
+            del stack[0]
+
+    def _apply(self, source, target, values_index):
+        if not source:
+            return None
+        diff = source.pop()
+        flat = diff[0]
+        self.grid.flat[flat] = diff[values_index]
+        self._push(target, diff)
+        return self.bounds(flat)
+
+    def undo(self):
+        # Restore the last stroke; returns the changed (rows, columns) slices or None
+        return self._apply(self.undo_stack, self.redo_stack, 1)
+
+    def redo(self):
+        return self._apply(self.redo_stack, self.undo_stack, 2)
+
+    def bounds(self, flat):
+        # Bounding (rows, columns) slices of flat cell indices
+        rows, cols = np.divmod(flat, self.grid.shape[1])
+        return slice(rows.min(), rows.max() + 1), slice(cols.min(), cols.max() + 1)
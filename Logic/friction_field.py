@@ -0,0 +1,108 @@
+import numpy as np
+from scipy.spatial import Delaunay
+from track_frame import metres_per_degree
+
+
+def grid_axis(start, stop, count=None, step=None):
+    # Cell centres from start to stop, either count of them or spaced by step
+    if step is None:
+        return np.linspace(start, stop, count)
+    return start + np.arange(int(np.ceil((stop - start) / step)) + 1) * step
+
+
+def rasterize_track(outer, inner, x, y):
+    """
+    Boolean mask (rows = y, columns = x) of the cell centres between the
+    outer and inner boundary. Scanline even-odd fill: every boundary edge
+    toggles the cells to the right of where it crosses each row, and a
+    running XOR along the rows turns the toggles into inside/outside.
+    """
+    toggles = np.zeros((len(y), len(x) + 1), dtype=np.uint8)
+    for ring in (outer, inner):
+        x0, y0 = ring[:, 0], ring[:, 1]
+        x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+        # Rows whose centre lies in [min(y0, y1), max(y0, y1)) for every edge
+        first = np.searchsorted(y, np.minimum(y0, y1), side='left')
+        last = np.searchsorted(y, np.maximum(y0, y1), side='left')
+        counts = last - first
+        edge = np.repeat(np.arange(len(ring)), counts)
+        row = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + first[edge]
+
+        t = (y[row] - y0[edge]) / (y1[edge] - y0[edge])
+        x_cross = x0[edge] + t * (x1[edge] - x0[edge])
+        np.bitwise_xor.at(toggles, (row, np.searchsorted(x, x_cross, side='right')), 1)
+
+    return np.bitwise_xor.accumulate(toggles, axis=1)[:, :len(x)].astype(bool)
+
+
+class FrictionField:
+    """
+    Friction values on a regular lon/lat grid, stored only for the cells
+    inside the track.
+
+    Values are interpolated linearly from control values at the boundary
+    points (the same scheme as griddata(method='linear')). The Delaunay
+    triangulation and every in-track cell's barycentric weights are computed
+    once, so new control values only cost one weighted gather. The grid is
+    either resolution x resolution cells over the bounding box or, with
+    cell_size, square cells of that many metres.
+    """
+
+    def __init__(self, outer, inner, resolution=1000, cell_size=None, control_values=None):
+        self.outer = np.asarray(outer, dtype=float)
+        self.inner = np.asarray(inner, dtype=float)
+
+        x_min, y_min = self.outer.min(axis=0)
+        x_max, y_max = self.outer.max(axis=0)
+        if cell_size is None:
+            self.x = grid_axis(x_min, x_max, count=resolution)
+            self.y = grid_axis(y_min, y_max, count=resolution)
+        else:
+            scale = metres_per_degree(self.outer[:, 1].mean())
+            self.x = grid_axis(x_min, x_max, step=cell_size / scale[0])
+            self.y = grid_axis(y_min, y_max, step=cell_size / scale[1])
+
+        self.mask = rasterize_track(self.outer, self.inner, self.x, self.y)
+        self.cells = np.flatnonzero(self.mask).astype(np.int32 if self.mask.size < 2 ** 31 else np.int64)
+        rows, cols = np.divmod(self.cells, len(self.x))
+        cell_points = np.column_stack([self.x[cols], self.y[rows]])
+
+        # Triangulate the control points once and keep each cell's barycentric weights
+        self.control_points = np.vstack([self.outer, self.inner])
+        self.triangulation = Delaunay(self.control_points)
+        simplex = self.triangulation.find_simplex(cell_points)
+        transform = self.triangulation.transform[simplex]
+        bary = np.einsum('ijk,ik->ij', transform[:, :2], cell_points - transform[:, 2])
+        self._weights = np.column_stack([bary, 1 - bary.sum(axis=1)]).astype(np.float32)
+        self._vertices = self.triangulation.simplices[simplex].astype(np.int32)
+        self._outside_hull = simplex < 0
+
+        if control_values is None:
+            control_values = np.linspace(0.8, 1.2, len(self.control_points))
+        self.set_control_values(control_values)
+
+    @property
+    def shape(self):
+        return len(self.y), len(self.x)
+
+    @property
+    def extent(self):
+        return self.x[0], self.x[-1], self.y[0], self.y[-1]
+
+    def set_control_values(self, control_values):
+        # Re-interpolate every in-track cell from new boundary values, reusing the triangulation
+        self.control_values = np.asarray(control_values, dtype=np.float32)
+        values = np.einsum('ij,ij->i', self._weights, self.control_values[self._vertices])
+        values[self._outside_hull] = np.nan
+        self.values = values
+
+    def grid(self, fill=np.nan):
+        # Dense [rows, columns] float32 grid with fill outside the track
+        dense = np.full(self.shape, fill, dtype=np.float32)
+        dense.flat[self.cells] = self.values
+        return dense
+
+    def cell_centres(self):
+        # Broadcast (read-only, no copy) x/y grids in the layout np.meshgrid would give
+        return np.broadcast_to(self.x, self.shape), np.broadcast_to(self.y[:, None], self.shape)
@@ -0,0 +1,74 @@
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+class FrictionMap:
+    """
+    Friction values of the in-track cells of a regular grid.
+
+    The grid is described by its origin, spacing and shape, so only the
+    track mask (one bit per cell) and one value per in-track cell are
+    stored. cells are the flat (row-major) indices of the in-track cells,
+    in the same order as values.
+    """
+
+    def __init__(self, origin, spacing, shape, mask, values):
+        self.origin = np.asarray(origin, dtype=float)
+        self.spacing = np.asarray(spacing, dtype=float)
+        self.shape = tuple(int(n) for n in shape)
+        self.mask = np.asarray(mask, dtype=bool).reshape(self.shape)
+        self.cells = np.flatnonzero(self.mask)
+        self.values = np.asarray(values, dtype=np.float32)
+
+    @classmethod
+    def from_grid(cls, grid, mask, x, y):
+        # From a dense grid with cell centre coordinates x (columns) and y (rows)
+        spacing = [(x[-1] - x[0]) / max(len(x) - 1, 1), (y[-1] - y[0]) / max(len(y) - 1, 1)]
+        return cls([x[0], y[0]], spacing, grid.shape, mask, grid[mask])
+
+    @property
+    def x(self):
+        return self.origin[0] + np.arange(self.shape[1]) * self.spacing[0]
+
+    @property
+    def y(self):
+        return self.origin[1] + np.arange(self.shape[0]) * self.spacing[1]
+
+    def coordinates(self, selection=slice(None)):
+        # [n, 2] lon/lat of in-track cells (all, or a boolean/index selection of values)
+        rows, cols = np.divmod(self.cells[selection], self.shape[1])
+        return self.origin + np.column_stack([cols, rows]) * self.spacing
+
+    def grid(self, fill=np.nan):
+        dense = np.full(self.shape, fill, dtype=np.float32)
+        dense.flat[self.cells] = self.values
+        return dense
+
+
+def save_friction_map(path, friction_map, dtype=np.float32):
+    """
+    Write a friction map as a compressed .npz: grid geometry, the bit-packed
+    track mask and the in-track values (float32 by default, the precision
+    the map is kept in, so painted values such as 0.6 or 1.4 reload on the
+    same side of the chatbot's zone thresholds).
+    """
+    np.savez_compressed(path, format_version=FORMAT_VERSION, origin=friction_map.origin,
+                        spacing=friction_map.spacing, shape=np.array(friction_map.shape),
+                        mask=np.packbits(friction_map.mask, axis=None),
+                        values=friction_map.values.astype(dtype))
+
+
+def load_friction_map(path):
+    with np.load(path) as data:
+        if int(data['format_version']) > FORMAT_VERSION:
+            raise ValueError(f"{path} was written by a newer version of the friction map format")
+        shape = tuple(data['shape'])
+        mask = np.unpackbits(data['mask'], count=shape[0] * shape[1]).astype(bool)
+        return FrictionMap(data['origin'], data['spacing'], shape, mask, data['values'])
+
+
+def save_friction_csv(path, friction_map):
+    # Legacy X, Y, Friction table with one row per in-track cell
+    table = np.column_stack([friction_map.coordinates(), friction_map.values])
+    np.savetxt(path, table, delimiter=',', header='X,Y,Friction', comments='')
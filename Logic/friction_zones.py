@@ -0,0 +1,139 @@
+import numpy as np
+from spatial_index import TrackIndex
+from track_curve import TrackCurve
+from track_frame import metres_per_degree, track_frame
+
+# Zone kinds as (lower, upper) friction bounds, both exclusive; None is unbounded
+ZONE_THRESHOLDS = {
+    'wet': (None, 0.6),
+    'degradation': (1.4, None),
+}
+REFERENCE_SAMPLES = 4000
+
+
+def label_zones(friction_map, selected, connectivity=8):
+    """
+    Connected-component labels (1..n) of the selected in-track cells, in
+    the order of friction_map.cells[selected]. Diagonal neighbours are
+    connected when connectivity is 8.
+    """
+    from scipy import ndimage
+
+    dense = np.zeros(friction_map.shape, dtype=bool)
+    dense.flat[friction_map.cells[selected]] = True
+    structure = np.ones((3, 3), dtype=bool) if connectivity == 8 else None
+    labels, count = ndimage.label(dense, structure=structure)
+    return labels.flat[friction_map.cells[selected]], count
+
+
+def circular_range(distances, length):
+    """
+    Smallest [start, end] interval of a closed lap covering every sorted
+    distance. start > end means the interval crosses the start line.
+    """
+    if len(distances) == 1:
+        return distances[0], distances[0]
+    gaps = np.diff(distances)
+    i = np.argmax(gaps)
+    if gaps[i] > distances[0] + length - distances[-1]:
+        return distances[i + 1], distances[i]
+    return distances[0], distances[-1]
+
+
+class FrictionZoneIndex:
+    """
+    Friction zones of a FrictionMap, labelled and summarised once.
+
+    Every zone kind in thresholds, plus the lowest ('least') and highest
+    ('most') friction cells, is split into connected regions with their
+    area, friction statistics, centroid and range along the track, so chat
+    queries are dictionary lookups. Track distances are metres along the
+    closed reference_line (e.g. the centre line) from its first point.
+    """
+
+    def __init__(self, friction_map, reference_line, thresholds=ZONE_THRESHOLDS, connectivity=8):
+        self.friction_map = friction_map
+        self.connectivity = connectivity
+        values = friction_map.values
+        self.min_friction = float(values.min())
+        self.max_friction = float(values.max())
+        self.mean_friction = float(values.mean())
+
+        scale = metres_per_degree(friction_map.origin[1])
+        self.cell_area = float(np.prod(friction_map.spacing * scale))
+
+        # Distance of every in-track cell along the reference line, in its track frame
+        frame = track_frame(reference_line)
+        curve = TrackCurve(frame.forward(reference_line))
+        samples = curve.evaluate(np.linspace(0, curve.length, REFERENCE_SAMPLES, endpoint=False))
+        step_m = np.hypot(*np.diff(samples, axis=0, append=samples[:1]).T)
+        distance_m = np.concatenate([[0.0], np.cumsum(step_m)])
+        self.track_length = float(distance_m[-1])
+        _, nearest = TrackIndex(samples).nearest(frame.forward(friction_map.coordinates()))
+        self.cell_distance = distance_m[nearest]
+
+        selections = {'least': values == values.min(), 'most': values == values.max()}
+        for kind, (lower, upper) in thresholds.items():
+            selected = np.ones(len(values), dtype=bool)
+            if lower is not None:
+                selected &= values > lower
+            if upper is not None:
+                selected &= values < upper
+            selections[kind] = selected
+
+        self.selections = selections
+        self.zones = {kind: self._summarise(kind, selected) for kind, selected in selections.items()}
+
+    def _summarise(self, kind, selected):
+        if not selected.any():
+            return []
+        labels, count = label_zones(self.friction_map, selected, self.connectivity)
+        values = self.friction_map.values[selected]
+        coords = self.friction_map.coordinates(selected)
+        distances = self.cell_distance[selected]
+
+        cells = np.bincount(labels, minlength=count + 1)[1:]
+        mean = np.bincount(labels, values, minlength=count + 1)[1:] / cells
+        low = np.full(count + 1, np.inf)
+        np.minimum.at(low, labels, values)
+        high = np.full(count + 1, -np.inf)
+        np.maximum.at(high, labels, values)
+        centroid = np.column_stack([np.bincount(labels, coords[:, i], minlength=count + 1)[1:]
+                                    for i in range(2)]) / cells[:, None]
+
+        # Distances grouped by zone, sorted within each zone
+        order = np.lexsort((distances, labels))
+        bounds = np.searchsorted(labels[order], np.arange(1, count + 2))
+
+        zones = []
+        for zone in range(count):
+            start, end = circular_range(distances[order[bounds[zone]:bounds[zone + 1]]], self.track_length)
+            zones.append({
+                'kind': kind,
+                'cells': int(cells[zone]),
+                'area_m2': cells[zone] * self.cell_area,
+                'min_friction': float(low[zone + 1]),
+                'mean_friction': float(mean[zone]),
+                'max_friction': float(high[zone + 1]),
+                'centroid': tuple(centroid[zone]),
+                'distance_start': float(start),
+                'distance_end': float(end),
+            })
+        return sorted(zones, key=lambda z: z['area_m2'], reverse=True)
+
+    def query(self, kind):
+        # Zones of one kind, largest first
+        return self.zones[kind]
+
+    def points(self, kind):
+        # Lon/lat of every cell in zones of this kind, for plotting
+        return self.friction_map.coordinates(self.selections[kind])
+
+
+def describe_zone(zone, index=None):
+    # One line chat summary of a zone dict
+    prefix = f"Zone {index}: " if index is not None else ""
+    lon, lat = zone['centroid']
+    return (f"{prefix}{zone['area_m2']:.0f} m^2 from {zone['distance_start']:.0f} m to "
+            f"{zone['distance_end']:.0f} m after the start line, friction min {zone['min_friction']:.2f} / "
+            f"mean {zone['mean_friction']:.2f}, centre ({lon:.6f}, {lat:.6f})")
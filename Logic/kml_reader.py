@@ -0,0 +1,141 @@
+import os
+import zipfile
+from contextlib import ExitStack
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+# Fraction of a line's points that must fall inside another line for it to
+# count as the inner boundary of that line
+CONTAINMENT_FRACTION = 0.95
+CONTAINMENT_SAMPLES = 64
+
+
+def _local(tag):
+    # Tag without its namespace, so KML 2.1/2.2, gx and un-namespaced files all match
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_coordinates(text):
+    """
+    KML coordinate text ("lon,lat[,alt] lon,lat[,alt] ...") to an [N, 2]
+    lon/lat array, converted in one vectorized call.
+    """
+    text = text.strip()
+    if not text:
+        return np.empty((0, 2))
+
+    dims = text.split(None, 1)[0].count(',') + 1
+    values = np.fromstring(text.replace(',', ' '), sep=' ')
+    # Every tuple has the same number of components as the first one
+    if dims > 1 and values.size % dims == 0 and text.count(',') == values.size // dims * (dims - 1):
+        return values.reshape(-1, dims)[:, :2]
+
+    # Mixed 2D/3D tuples: fall back to converting tuple by tuple
+    return np.array([[float(v) for v in t.split(',')[:2]] for t in text.split()])
+
+
+def _open_kml(path, stack):
+    # File object for a .kml, or the main document inside a .kmz archive (read without extracting)
+    if not zipfile.is_zipfile(path):
+        return stack.enter_context(open(path, 'rb'))
+    archive = stack.enter_context(zipfile.ZipFile(path))
+    names = [name for name in archive.namelist() if name.lower().endswith('.kml')]
+    if not names:
+        raise ValueError(f"No KML document in {path}")
+    return stack.enter_context(archive.open('doc.kml' if 'doc.kml' in names else names[0]))
+
+
+def iter_kml_lines(path):
+    """
+    Stream (placemark name, [N, 2] lon/lat array) for every coordinates
+    block in a KML or KMZ file. Elements are discarded as soon as they are
+    parsed, so memory stays flat however many placemarks the file holds.
+    """
+    with ExitStack() as stack:
+        name = None
+        for event, elem in ET.iterparse(_open_kml(path, stack), events=('start', 'end')):
+            tag = _local(elem.tag)
+            if event == 'start':
+                if tag == 'Placemark':
+                    name = None
+                continue
+
+            if tag == 'name' and name is None:
+                name = (elem.text or '').strip()
+            elif tag == 'coordinates':
+                yield name, parse_coordinates(elem.text or '')
+                elem.clear()
+            elif tag == 'Placemark':
+                elem.clear()
+
+
+def polygon_area(points):
+    # Signed shoelace area: positive for counter-clockwise loops
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+
+def points_in_polygon(points, polygon, chunk=16):
+    # Even-odd ray casting, vectorized over polygon edges and a chunk of points at a time
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    inside = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(points), chunk):
+        px = points[start:start + chunk, 0, None]
+        py = points[start:start + chunk, 1, None]
+        crosses = (y0 > py) != (y1 > py)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+        inside[start:start + chunk] = np.count_nonzero(crosses & (px < x_cross), axis=1) % 2 == 1
+    return inside
+
+
+def contains(outer, inner):
+    sample = inner[np.linspace(0, len(inner) - 1, min(len(inner), CONTAINMENT_SAMPLES)).astype(int)]
+    return points_in_polygon(sample, outer).mean() >= CONTAINMENT_FRACTION
+
+
+def identify_boundaries(lines, names=None):
+    """
+    Pick the outer and inner track boundary from a list of [N, 2] lines.
+
+    If the placemarks are named 'Line 1' (outer) and 'Line 3' (inner), as
+    in the track KMLs this reader was written for, those are used.
+    Otherwise the boundaries are picked by geometry: the outer boundary is
+    the largest loop, and the inner boundary is the innermost loop inside
+    it (one that contains no other candidate), so a centre or racing line
+    between the boundaries is never taken for the inner boundary.
+    """
+    if names is not None:
+        named = {name: line for name, line in zip(names, lines) if len(line) >= 4}
+        if 'Line 1' in named and 'Line 3' in named:
+            return named['Line 1'], named['Line 3']
+
+    loops = [line for line in lines if len(line) >= 4]
+    if len(loops) < 2:
+        raise ValueError(f"Expected two track boundaries, found {len(loops)} lines")
+
+    loops.sort(key=lambda line: abs(polygon_area(line)), reverse=True)
+    for i, outer in enumerate(loops):
+        candidates = [inner for inner in loops[i + 1:] if contains(outer, inner)]
+        if not candidates:
+            continue
+        # Candidates are in decreasing area order; the largest innermost one is the boundary
+        for j, inner in enumerate(candidates):
+            if not any(contains(inner, other) for other in candidates[j + 1:]):
+                return outer, inner
+    raise ValueError("No line lies inside another; cannot tell the inner boundary from the outer")
+
+
+def read_track_kml(path):
+    """
+    Outer and inner boundary ([N, 2] lon/lat arrays) of a track KML/KMZ.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    names, lines = [], []
+    for name, coords in iter_kml_lines(path):
+        names.append(name)
+        lines.append(coords)
+    return identify_boundaries(lines, names)
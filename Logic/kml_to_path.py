@@ -1,24 +1,25 @@
-import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
-import requests
-from scipy.interpolate import griddata
-from matplotlib.colors import Normalize
-import matplotlib.cm as cm
-from matplotlib.widgets import Button
-import xml.etree.ElementTree as ET
-from scipy.optimize import minimize
-from scipy.interpolate import interp1d
+from min_curvature import min_curvature_path, resample_boundaries
+from kml_reader import read_track_kml
+from result_cache import shared_cache
+from track_frame import track_frame
+
+# matplotlib, requests and scipy are imported inside
+# the functions that use them, so importing this module has no heavy start-up
+# cost and no side effects (the interactive pipeline only runs as a script).
 
 # Configuration
-CIRCLE_RADIUS = 0.000025  # Radius of friction change on click
+CIRCLE_RADIUS = 2.5  # Radius of friction change on click, in metres
+BRUSH_FALLOFF = 'hard'  # 'hard', 'linear' or 'smooth'
+FRICTION_MAP_FILE = 'modified_friction.npz'
+MAX_LISTED_ZONES = 10  # Zones listed per chatbot answer, largest first
 GROQ_API_KEY = "your groq key"
 GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 
 # Global variables
 selected_friction = 1.0
 friction_grid = None
+friction_field = None
 track_mask = None
 outer_boundary = None
 inner_boundary = None
@@ -27,69 +28,46 @@ x_grid = y_grid = None
 
 # Parse KML file and extract coordinates
 def parse_kml(file_path):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-
-    # Namespace dictionary
-    ns = {'kml': 'http://www.opengis.net/kml/2.2'}
-
-    # Extract coordinates for outer and inner boundaries
-    outer_coords = []
-    inner_coords = []
-
-    for placemark in root.findall('.//kml:Placemark', ns):
-        name = placemark.find('kml:name', ns).text
-        coordinates = placemark.find('.//kml:coordinates', ns).text.strip()
-        coords_list = [tuple(map(float, coord.split(','))) for coord in coordinates.split()]
-
-        if name == 'Line 1':
-            outer_coords = coords_list
-        elif name == 'Line 3':
-            inner_coords = coords_list
+    # Outer and inner boundary, identified by geometry (see kml_reader)
+    return read_track_kml(file_path)
 
-    # Convert to numpy arrays and remove altitude (z-coordinate)
-    outer_boundary = np.array([(x, y) for x, y, _ in outer_coords])
-    inner_boundary = np.array([(x, y) for x, y, _ in inner_coords])
 
-    return outer_boundary, inner_boundary
+def optimal_racing_line(outer, inner):
+    # Minimum curvature line solved in track frame metres (cached by geometry), returned as lon/lat
+    frame = track_frame(outer)
+    path = min_curvature_path(frame.forward(outer), frame.forward(inner), cache=shared_cache())
+    return frame.inverse(path)
 
 # Generate a smooth gradient inside the track
-def generate_friction_gradient(outer_boundary, inner_boundary, resolution=1000):
-    global x_grid, y_grid
+def generate_friction_gradient(outer_boundary, inner_boundary, resolution=1000, cell_size=None):
+    from friction_field import FrictionField
+    global x_grid, y_grid, friction_field
 
-    x_min, x_max = min(outer_boundary[:, 0]), max(outer_boundary[:, 0])
-    y_min, y_max = min(outer_boundary[:, 1]), max(outer_boundary[:, 1])
+    # Values are only computed for in-track cells; cell_size (metres) overrides resolution
+    friction_field = FrictionField(outer_boundary, inner_boundary, resolution=resolution, cell_size=cell_size)
+    x_grid, y_grid = friction_field.cell_centres()
+    x_min, x_max, y_min, y_max = friction_field.extent
 
-    x_grid, y_grid = np.meshgrid(np.linspace(x_min, x_max, resolution),
-                                 np.linspace(y_min, y_max, resolution))
-
-    track_points = np.vstack([outer_boundary, inner_boundary])
-    friction_values = np.linspace(0.8, 1.2, len(track_points))
-
-    friction_grid = griddata(track_points, friction_values, (x_grid, y_grid), method='linear')
-
-    return x_min, x_max, y_min, y_max, friction_grid
+    return x_min, x_max, y_min, y_max, friction_field.grid()
 
 # Create track mask
 def create_track_mask(outer_boundary, inner_boundary, x_grid, y_grid):
-    mask = np.zeros_like(x_grid, dtype=np.uint8)
-
-    track_shape = x_grid.shape
-    scale_x = track_shape[1] / (x_max - x_min)
-    scale_y = track_shape[0] / (y_max - y_min)
+    from friction_field import rasterize_track
 
-    outer_scaled = np.column_stack([(outer_boundary[:, 0] - x_min) * scale_x,
-                                    (outer_boundary[:, 1] - y_min) * scale_y]).astype(np.int32)
-    inner_scaled = np.column_stack([(inner_boundary[:, 0] - x_min) * scale_x,
-                                    (inner_boundary[:, 1] - y_min) * scale_y]).astype(np.int32)
-
-    cv2.fillPoly(mask, [outer_scaled], 1)
-    cv2.fillPoly(mask, [inner_scaled], 0)
-
-    return mask
+    if friction_field is not None and friction_field.shape == x_grid.shape:
+        return friction_field.mask
+    return rasterize_track(outer_boundary, inner_boundary, x_grid[0, :], y_grid[:, 0])
 
 # Interactive plotting
 def plot_friction_map():
+    import matplotlib.pyplot as plt
+    import matplotlib.cm as cm
+    from matplotlib.colors import Normalize
+    from matplotlib.image import AxesImage
+    from matplotlib.transforms import Bbox
+    from matplotlib.widgets import Button
+    from friction_brush import FALLOFFS, FrictionBrush
+    from track_frame import metres_per_degree
     global friction_grid, selected_friction
 
     friction_grid_masked = np.where(track_mask, friction_grid, np.nan)
@@ -100,19 +78,64 @@ def plot_friction_map():
 
     friction_img = ax.imshow(friction_grid_masked, cmap=cmap, norm=norm,
                              extent=[x_min, x_max, y_min, y_max], origin='lower')
+    display = friction_img.get_array()  # Masked copy of the grid, updated in place
 
-    ax.plot(outer_boundary[:, 0], outer_boundary[:, 1], 'r', label="Outer Boundary")
-    ax.plot(inner_boundary[:, 0], inner_boundary[:, 1], 'b', label="Inner Boundary")
+    boundary_lines = ax.plot(outer_boundary[:, 0], outer_boundary[:, 1], 'r', label="Outer Boundary")
+    boundary_lines += ax.plot(inner_boundary[:, 0], inner_boundary[:, 1], 'b', label="Inner Boundary")
 
-    ax.set_title("Interactive Friction Map")
-    ax.legend()
+    ax.set_title("Interactive Friction Map (drag to paint, ctrl+z/ctrl+y undo/redo, [ ] brush size, b falloff)")
+    legend = ax.legend()
+
+    # Small image drawn over just the painted window, so a brush stroke never re-renders the full grid
+    patch_img = AxesImage(ax, cmap=cmap, norm=norm, origin='lower', animated=True,
+                          interpolation=friction_img.get_interpolation())
+    ax.add_image(patch_img)
+    patch_img.set_clip_path(ax.patch)
+    ax.set_autoscale_on(False)
+    cell_width = (x_max - x_min) / friction_grid.shape[1]
+    cell_height = (y_max - y_min) / friction_grid.shape[0]
 
     cbar_ax = fig.add_axes([0.92, 0.2, 0.02, 0.6])
     cbar = plt.colorbar(cm.ScalarMappable(norm=norm, cmap=cmap), cax=cbar_ax)
     cbar.set_label("Friction Coefficient")
 
-    def on_click(event):
-        global selected_friction, friction_grid
+    brush = FrictionBrush(friction_grid, track_mask, x_grid[0, :], y_grid[:, 0], CIRCLE_RADIUS,
+                          falloff=BRUSH_FALLOFF, scale=metres_per_degree((y_min + y_max) / 2))
+    canvas_drawn = False
+
+    def on_draw(event):
+        nonlocal canvas_drawn
+        canvas_drawn = True
+
+    def refresh(changed):
+        # Update only the changed window of the displayed image and blit only its screen area
+        if changed is None:
+            return
+        rows, cols = changed
+        window = np.where(track_mask[rows, cols], friction_grid[rows, cols], np.nan)
+        display[rows, cols] = np.ma.masked_invalid(window)
+        friction_img.changed()  # Full redraws (zoom, pan, resize) show the edit too
+
+        if not canvas_drawn or not fig.canvas.supports_blit:
+            fig.canvas.draw_idle()
+            return
+        extent = [x_min + cols.start * cell_width, x_min + cols.stop * cell_width,
+                  y_min + rows.start * cell_height, y_min + rows.stop * cell_height]
+        corners = ax.transData.transform([extent[::2], extent[1::2]])
+        region = Bbox.intersection(Bbox(np.sort(corners, axis=0)).padded(2), ax.bbox)
+        if region is None:
+            return
+
+        patch_img.set_data(window)
+        patch_img.set_extent(extent)
+        for artist in [patch_img, *boundary_lines]:
+            ax.draw_artist(artist)
+        if legend.get_window_extent().overlaps(region):
+            ax.draw_artist(legend)
+        fig.canvas.blit(region)
+
+    def on_press(event):
+        global selected_friction
 
         if event.inaxes == cbar_ax:
             # Select friction value from color scale
@@ -121,29 +144,34 @@ def plot_friction_map():
             selected_friction = np.clip(selected_friction, norm.vmin, norm.vmax)
             print(f"Selected friction: {selected_friction:.2f}")
 
-        elif event.inaxes == ax:
-            x, y = event.xdata, event.ydata
-
-            # Calculate the grid indices corresponding to the click coordinates
-            x_idx = np.argmin(np.abs(x_grid[0, :] - x))
-            y_idx = np.argmin(np.abs(y_grid[:, 0] - y))
-
-            # Define a circular region around the selected point
-            for i in range(max(0, y_idx - 10), min(friction_grid.shape[0], y_idx + 10)):
-                for j in range(max(0, x_idx - 10), min(friction_grid.shape[1], x_idx + 10)):
-                    if track_mask[i, j]:
-                        # Calculate the distance from the click point
-                        dist = np.sqrt((x_grid[i, j] - x) ** 2 + (y_grid[i, j] - y) ** 2)
-                        if dist <= CIRCLE_RADIUS:
-                            friction_grid[i, j] = selected_friction  # Update only within the circular region
-
-            # Update the visualization
-            friction_img.set_data(np.where(track_mask, friction_grid, np.nan))
-            fig.canvas.draw()
-            print(f"Updated friction in a circular region around ({x:.1f}, {y:.1f})")
+        elif event.inaxes == ax and event.button == 1 and not getattr(fig.canvas.toolbar, 'mode', None):
+            brush.begin_stroke()
+            refresh(brush.drag(event.xdata, event.ydata, selected_friction))
+
+    def on_motion(event):
+        if brush.in_stroke and event.inaxes == ax:
+            refresh(brush.drag(event.xdata, event.ydata, selected_friction))
+
+    def on_release(event):
+        if brush.in_stroke:
+            changed = brush.end_stroke()
+            print(f"Updated friction of {changed} cells to {selected_friction:.2f}")
+
+    def on_key(event):
+        if event.key == 'ctrl+z':
+            refresh(brush.undo())
+        elif event.key == 'ctrl+y':
+            refresh(brush.redo())
+        elif event.key in ('[', ']'):
+            brush.radius *= 0.8 if event.key == '[' else 1.25
+            print(f"Brush radius: {brush.radius:.2f} m")
+        elif event.key == 'b':
+            falloffs = list(FALLOFFS)
+            brush.falloff = falloffs[(falloffs.index(brush.falloff) + 1) % len(falloffs)]
+            print(f"Brush falloff: {brush.falloff}")
 
     def on_done(event):
-        save_friction_values("modified_friction.csv")
+        save_friction_values(FRICTION_MAP_FILE)
         plt.close(fig)
         print("Chatbot: Friction map saved. You can now ask me about wet zones, max friction, etc.")
 
@@ -151,20 +179,24 @@ def plot_friction_map():
     done_button = Button(done_ax, 'Done')
     done_button.on_clicked(on_done)
 
-    fig.canvas.mpl_connect('button_press_event', on_click)
+    fig.canvas.mpl_connect('draw_event', on_draw)
+    fig.canvas.mpl_connect('button_press_event', on_press)
+    fig.canvas.mpl_connect('motion_notify_event', on_motion)
+    fig.canvas.mpl_connect('button_release_event', on_release)
+    fig.canvas.mpl_connect('key_press_event', on_key)
     plt.show()
 
 # Save friction values
-def save_friction_values(output_csv):
-    rows = []
-    for i in range(friction_grid.shape[0]):
-        for j in range(friction_grid.shape[1]):
-            if track_mask[i, j]:
-                rows.append([x_grid[i, j], y_grid[i, j], friction_grid[i, j]])
+def save_friction_values(output_file):
+    from friction_map import FrictionMap, save_friction_csv, save_friction_map
 
-    df = pd.DataFrame(rows, columns=['X', 'Y', 'Friction'])
-    df.to_csv(output_csv, index=False)
-    print(f"Modified friction values saved to {output_csv}")
+    # Compact .npz by default; a .csv path writes the old per-cell table
+    friction_map = FrictionMap.from_grid(friction_grid, track_mask, x_grid[0, :], y_grid[:, 0])
+    if output_file.lower().endswith('.csv'):
+        save_friction_csv(output_file, friction_map)
+    else:
+        save_friction_map(output_file, friction_map)
+    print(f"Modified friction values saved to {output_file}")
 
 # Interpolate boundaries to the same length
 def interpolate_boundaries(outer_boundary, inner_boundary):
@@ -191,6 +223,7 @@ def interpolate_boundaries(outer_boundary, inner_boundary):
 
 # Plot track without black fill
 def plot_track():
+    import matplotlib.pyplot as plt
     global outer_boundary, inner_boundary
 
     # Interpolate boundaries to the same length
@@ -205,6 +238,7 @@ def plot_track():
 
 # Highlight points on the track
 def highlight_points(points, color, label):
+    import matplotlib.pyplot as plt
     global outer_boundary, inner_boundary
 
     # Close any existing track visualization
@@ -221,72 +255,37 @@ def highlight_points(points, color, label):
     ax.legend()
     plt.show()
 
-def min_curvature_path(outer_boundary, inner_boundary, nseg=1500):
-    """
-    Compute the minimum curvature path between the outer and inner boundaries.
-    """
-    # Interpolate boundaries to have the same number of points
-    t_outer = np.linspace(0, 1, len(outer_boundary))
-    t_inner = np.linspace(0, 1, len(inner_boundary))
-    f_outer = interp1d(t_outer, outer_boundary, axis=0, kind='linear')
-    f_inner = interp1d(t_inner, inner_boundary, axis=0, kind='linear')
-    t_new = np.linspace(0, 1, nseg)
-    outer_interp = f_outer(t_new)
-    inner_interp = f_inner(t_new)
-
-    # Compute deltas between inner and outer boundaries
-    delx = outer_interp[:, 0] - inner_interp[:, 0]
-    dely = outer_interp[:, 1] - inner_interp[:, 1]
-
-    # Form H matrix (quadratic term)
-    n = len(delx)
-    H = np.zeros((n, n))
-    for i in range(1, n - 1):
-        H[i - 1, i - 1] += delx[i - 1] ** 2 + dely[i - 1] ** 2
-        H[i - 1, i] += -2 * delx[i - 1] * delx[i] - 2 * dely[i - 1] * dely[i]
-        H[i - 1, i + 1] += delx[i - 1] * delx[i + 1] + dely[i - 1] * dely[i + 1]
-        H[i, i - 1] += -2 * delx[i - 1] * delx[i] - 2 * dely[i - 1] * dely[i]
-        H[i, i] += 4 * delx[i] ** 2 + 4 * dely[i] ** 2
-        H[i, i + 1] += -2 * delx[i] * delx[i + 1] - 2 * dely[i] * dely[i + 1]
-        H[i + 1, i - 1] += delx[i - 1] * delx[i + 1] + dely[i - 1] * dely[i + 1]
-        H[i + 1, i] += -2 * delx[i] * delx[i + 1] - 2 * dely[i] * dely[i + 1]
-        H[i + 1, i + 1] += delx[i + 1] ** 2 + dely[i + 1] ** 2
-
-    # Form B vector (linear term)
-    B = np.zeros(n)
-    for i in range(1, n - 1):
-        B[i - 1] += 2 * (inner_interp[i + 1, 0] + inner_interp[i - 1, 0] - 2 * inner_interp[i, 0]) * delx[i - 1] + \
-                    2 * (inner_interp[i + 1, 1] + inner_interp[i - 1, 1] - 2 * inner_interp[i, 1]) * dely[i - 1]
-        B[i] += -4 * (inner_interp[i + 1, 0] + inner_interp[i - 1, 0] - 2 * inner_interp[i, 0]) * delx[i] + \
-                -4 * (inner_interp[i + 1, 1] + inner_interp[i - 1, 1] - 2 * inner_interp[i, 1]) * dely[i]
-        B[i + 1] += 2 * (inner_interp[i + 1, 0] + inner_interp[i - 1, 0] - 2 * inner_interp[i, 0]) * delx[i + 1] + \
-                    2 * (inner_interp[i + 1, 1] + inner_interp[i - 1, 1] - 2 * inner_interp[i, 1]) * dely[i + 1]
-
-    # Define constraints (start and end points are the same)
-    Aeq = np.zeros((1, n))
-    Aeq[0, 0] = 1
-    Aeq[0, -1] = -1
-    beq = np.array([0])
-
-    # Solve the quadratic programming problem
-    res = minimize(lambda x: 0.5 * x.T @ H @ x + B @ x,
-                   x0=np.zeros(n),
-                   constraints={'type': 'eq', 'fun': lambda x: Aeq @ x - beq},
-                   bounds=[(0, 1)] * n)
-
-    # Compute the minimum curvature path
-    x_res = inner_interp[:, 0] + res.x * delx
-    y_res = inner_interp[:, 1] + res.x * dely
-    return np.column_stack((x_res, y_res))
-
 # Chatbot Function
 def chat_with_groq():
+    import matplotlib.pyplot as plt
+    import requests
+    from friction_map import load_friction_map
+    from friction_zones import FrictionZoneIndex, describe_zone
+
     print("\n--- Chatbot Started! Ask me anything. Use 'my track', 'my circuit', or 'my racetrack' for track-related queries. Type 'exit' to quit. ---\n")
 
     # Prompt the user to tweak the friction map
     print("Chatbot: Let's start by tweaking the friction map. Adjust the friction values as needed and click 'Done' when finished.")
     plot_friction_map()
 
+    # Read the saved map and index its zones once; every track question is a lookup
+    try:
+        friction_map = load_friction_map(FRICTION_MAP_FILE)
+        centre_line = np.mean(resample_boundaries(outer_boundary, inner_boundary, 2000), axis=0)
+        zone_index = FrictionZoneIndex(friction_map, centre_line)
+    except Exception as e:
+        zone_index = None
+        load_error = e
+
+    def report_zones(kind, color, label):
+        zones = zone_index.query(kind)
+        for number, zone in enumerate(zones[:MAX_LISTED_ZONES], 1):
+            print(describe_zone(zone, number))
+        if len(zones) > MAX_LISTED_ZONES:
+            print(f"... and {len(zones) - MAX_LISTED_ZONES} smaller zones")
+        points = zone_index.points(kind)
+        highlight_points({'X': points[:, 0], 'Y': points[:, 1]}, color, label)
+
     while True:
         user_input = input("You: ").lower()
 
@@ -298,50 +297,41 @@ def chat_with_groq():
         # Check for track-related cues
         if any(phrase in user_input for phrase in ["my track", "my circuit", "my racetrack"]):
             try:
-                df = pd.read_csv("modified_friction.csv")
+                if zone_index is None:
+                    raise load_error
 
                 if "least friction" in user_input:
-                    min_friction = df["Friction"].min()
-                    least_friction_points = df[df["Friction"] == min_friction][["X", "Y"]]
-                    print(f"Lowest friction: {min_friction:.2f}")
+                    print(f"Lowest friction: {zone_index.min_friction:.2f}")
                     print("Locations:")
-                    print(least_friction_points)
-                    highlight_points(least_friction_points, 'red', 'Least Friction Zones')
+                    report_zones('least', 'red', 'Least Friction Zones')
 
                 elif "most friction" in user_input:
-                    max_friction = df["Friction"].max()
-                    most_friction_points = df[df["Friction"] == max_friction][["X", "Y"]]
-                    print(f"Highest friction: {max_friction:.2f}")
+                    print(f"Highest friction: {zone_index.max_friction:.2f}")
                     print("Locations:")
-                    print(most_friction_points)
-                    highlight_points(most_friction_points, 'green', 'Maximum Friction Zones')
+                    report_zones('most', 'green', 'Maximum Friction Zones')
 
                 elif "average friction" in user_input:
-                    avg_friction = df["Friction"].mean()
-                    print(f"Average friction on the track: {avg_friction:.2f}")
+                    print(f"Average friction on the track: {zone_index.mean_friction:.2f}")
 
                 elif "wet zones" in user_input or "water puddles" in user_input:
-                    wet_zones = df[df["Friction"] < 0.6][["X", "Y", "Friction"]]
-                    if wet_zones.empty:
+                    if not zone_index.query('wet'):
                         print("No wet zones detected on your track.")
                     else:
                         print("Wet zones (friction < 0.6) detected at:")
-                        print(wet_zones)
-                        highlight_points(wet_zones[["X", "Y"]], 'blue', 'Wet Zones')
+                        report_zones('wet', 'blue', 'Wet Zones')
 
                 elif "tyre degradation zones" in user_input or "rough gravel zones" in user_input:
-                    high_friction_zones = df[df["Friction"] > 1.4][["X", "Y", "Friction"]]
-                    if high_friction_zones.empty:
+                    if not zone_index.query('degradation'):
                         print("No tyre degradation zones detected on your track.")
                     else:
                         print("Tyre degradation zones (friction > 1.4) detected at:")
-                        print(high_friction_zones)
-                        highlight_points(high_friction_zones[["X", "Y"]], 'yellow', 'Tyre Degradation Zones')
+                        report_zones('degradation', 'yellow', 'Tyre Degradation Zones')
 
                 elif "optimal racing line" in user_input or "minimum curvature path" in user_input:
                     try:
-                        optimal_path = min_curvature_path(outer_boundary, inner_boundary)
-                        highlight_points(pd.DataFrame(optimal_path, columns=['X', 'Y']), 'green', 'Optimal Racing Line')
+                        optimal_path = optimal_racing_line(outer_boundary, inner_boundary)
+                        highlight_points({'X': optimal_path[:, 0], 'Y': optimal_path[:, 1]}, 'green',
+                                         'Optimal Racing Line')
                     except Exception as e:
                         print("Error computing optimal racing line:", str(e))
 
@@ -375,22 +365,25 @@ def chat_with_groq():
             print("Error:", str(e))
 
 # Run the pipeline
-kml_file = 'abu_dhabi_final.kml'  # Replace with your KML file path
-outer_boundary, inner_boundary = parse_kml(kml_file)
-x_min, x_max, y_min, y_max, friction_grid = generate_friction_gradient(outer_boundary, inner_boundary)
-track_mask = create_track_mask(outer_boundary, inner_boundary, x_grid, y_grid)
-
-# Start the chatbot
-chat_with_groq()
-
-# Compute the minimum curvature path
-optimal_path = min_curvature_path(outer_boundary, inner_boundary)
-
-# Plot the optimal path
-fig, ax = plt.subplots(figsize=(10, 8))
-ax.plot(outer_boundary[:, 0], outer_boundary[:, 1], 'r', label="Outer Boundary")
-ax.plot(inner_boundary[:, 0], inner_boundary[:, 1], 'b', label="Inner Boundary")
-ax.plot(optimal_path[:, 0], optimal_path[:, 1], 'g', label="Optimal Racing Line")
-ax.set_title("Track with Optimal Racing Line")
-ax.legend()
-plt.show()
\ No newline at end of file
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    kml_file = 'abu_dhabi_final.kml'  # Replace with your KML file path
+    outer_boundary, inner_boundary = parse_kml(kml_file)
+    x_min, x_max, y_min, y_max, friction_grid = generate_friction_gradient(outer_boundary, inner_boundary)
+    track_mask = create_track_mask(outer_boundary, inner_boundary, x_grid, y_grid)
+
+    # Start the chatbot
+    chat_with_groq()
+
+    # Compute the minimum curvature path
+    optimal_path = optimal_racing_line(outer_boundary, inner_boundary)
+
+    # Plot the optimal path
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.plot(outer_boundary[:, 0], outer_boundary[:, 1], 'r', label="Outer Boundary")
+    ax.plot(inner_boundary[:, 0], inner_boundary[:, 1], 'b', label="Inner Boundary")
+    ax.plot(optimal_path[:, 0], optimal_path[:, 1], 'g', label="Optimal Racing Line")
+    ax.set_title("Track with Optimal Racing Line")
+    ax.legend()
+    plt.show()
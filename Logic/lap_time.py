@@ -0,0 +1,81 @@
+import time
+import numpy as np
+from min_curvature import resample_boundaries, assemble_curvature_qp, solve_box_qp
+from speed_profile import path_speed_profile
+
+
+def time_weights(speed, weights=None, damping=0.5):
+    # Curvature weight per unique sample: inverse squared speed, damped towards the previous weights
+    new_weights = 1.0 / speed[:-1] ** 2
+    new_weights /= new_weights.mean()
+    if weights is None:
+        return new_weights
+    return damping * weights + (1 - damping) * new_weights
+
+
+def min_lap_time_path(outer_boundary, inner_boundary, nseg=1500, friction=1.0, vehicle=None,
+                      max_iter=10, tol=1e-4, damping=0.5, verbose=False, metric=False,
+                      alpha0=None, weights0=None):
+    """
+    Approximate the minimum lap time line by iterating the curvature QP.
+
+    Each iteration solves the min curvature QP with per-sample weights,
+    evaluates the speed profile of the result and re-weights every sample
+    by the inverse square of its speed. Curvature then costs most in slow
+    corners, where most of the lap time is spent, and little on fast
+    sections. The QP is warm-started from the previous solution.
+
+    Boundaries are lon/lat, or track frame metres with metric=True.
+    friction is a scalar, one coefficient per sample, or a function of
+    the path returning one per sample (e.g. a friction map lookup).
+    alpha0 and weights0 (the alpha and weights of an earlier iteration)
+    warm-start the first QP, e.g. after the friction changed.
+    Returns the best path found and the per-iteration report as a list of
+    dicts (iteration, lap_time, qp_iterations, seconds, and the alpha and
+    weights of the iteration); verbose=True also prints it as it runs.
+    """
+    outer_interp, inner_interp = resample_boundaries(outer_boundary, inner_boundary, nseg)
+    delx = outer_interp[:, 0] - inner_interp[:, 0]
+    dely = outer_interp[:, 1] - inner_interp[:, 1]
+
+    weights = np.ones(nseg - 1) if weights0 is None else weights0
+    alpha = alpha0
+    best_path, best_lap_time = None, np.inf
+    history = []
+
+    for iteration in range(max_iter):
+        start = time.perf_counter()
+
+        # Weighted curvature QP on the unique samples, warm-started
+        H, B = assemble_curvature_qp(inner_interp[:-1], delx[:-1], dely[:-1], closed=True, weights=weights)
+        alpha, qp_iterations = solve_box_qp(H, B, x0=alpha)
+
+        closed_alpha = np.append(alpha, alpha[0])
+        path = np.column_stack((inner_interp[:, 0] + closed_alpha * delx,
+                                inner_interp[:, 1] + closed_alpha * dely))
+        mu = friction(path) if callable(friction) else friction
+        profile = path_speed_profile(path, friction=mu, vehicle=vehicle, metric=metric)
+
+        lap_time = profile['lap_time']
+        history.append({
+            'iteration': iteration,
+            'lap_time': lap_time,
+            'qp_iterations': qp_iterations,
+            'seconds': time.perf_counter() - start,
+            'alpha': alpha,
+            'weights': weights,
+        })
+        if verbose:
+            print(f"Iteration {iteration}: lap time {lap_time:.3f} s "
+                  f"({qp_iterations} QP iterations, {history[-1]['seconds']:.3f} s)")
+
+        improvement = best_lap_time - lap_time
+        if lap_time < best_lap_time:
+            best_path, best_lap_time = path, lap_time
+        if improvement < tol * lap_time:
+            break
+
+        # Re-weight by time sensitivity, damped to avoid oscillation
+        weights = time_weights(profile['speed'], weights, damping)
+
+    return best_path, history
@@ -0,0 +1,237 @@
+import numpy as np
+
+# SciPy is imported inside the functions that need it so that importing this
+# module (e.g. in a worker process) only costs the NumPy import.
+
+
+def resample_boundaries(outer_boundary, inner_boundary, nseg):
+    """
+    Interpolate both boundaries to nseg points on a common [0, 1] parameter.
+    """
+    t_new = np.linspace(0, 1, nseg)
+
+    def interp(boundary):
+        t = np.linspace(0, 1, len(boundary))
+        return np.column_stack([np.interp(t_new, t, boundary[:, d]) for d in range(boundary.shape[1])])
+
+    return interp(outer_boundary), interp(inner_boundary)
+
+
+def assemble_curvature_qp(inner_interp, delx, dely, closed=True, weights=None):
+    """
+    Build the pentadiagonal H matrix (sparse CSC) and the B vector of the
+    minimum curvature QP 0.5 * x'Hx + B'x without Python loops.
+
+    H = Dx'WDx + Dy'WDy where Dx, Dy are the second-difference operators
+    scaled by the track width vectors and W weights the curvature of each
+    sample (identity by default). With closed=True the stencil wraps
+    around the start/finish line so the loop is coupled periodically.
+    """
+    import scipy.sparse as sp
+
+    n = len(delx)
+    if closed:
+        rows = np.arange(n)
+    else:
+        rows = np.arange(1, n - 1)
+    prev_idx = (rows - 1) % n
+    next_idx = (rows + 1) % n
+
+    row_ids = np.repeat(np.arange(len(rows)), 3)
+    col_ids = np.column_stack([prev_idx, rows, next_idx]).ravel()
+    shape = (len(rows), n)
+    Dx = sp.csr_matrix((np.column_stack([delx[prev_idx], -2 * delx[rows], delx[next_idx]]).ravel(),
+                        (row_ids, col_ids)), shape=shape)
+    Dy = sp.csr_matrix((np.column_stack([dely[prev_idx], -2 * dely[rows], dely[next_idx]]).ravel(),
+                        (row_ids, col_ids)), shape=shape)
+
+    # Second differences of the inner boundary (constant part of the curvature)
+    cx = inner_interp[next_idx, 0] + inner_interp[prev_idx, 0] - 2 * inner_interp[rows, 0]
+    cy = inner_interp[next_idx, 1] + inner_interp[prev_idx, 1] - 2 * inner_interp[rows, 1]
+
+    if weights is not None:
+        W = sp.diags(np.asarray(weights, dtype=float)[rows])
+        Dx_w, Dy_w = W @ Dx, W @ Dy
+    else:
+        Dx_w, Dy_w = Dx, Dy
+
+    H = (Dx_w.T @ Dx + Dy_w.T @ Dy).tocsc()
+    B = 2 * (Dx_w.T @ cx + Dy_w.T @ cy)
+    return H, B
+
+
+def solve_box_qp(H, B, lower=0.0, upper=1.0, x0=None, tol=1e-8, max_iter=100, warm_iter=8):
+    """
+    Solve min 0.5 * x'Hx + B'x subject to lower <= x <= upper with a
+    Mehrotra predictor-corrector interior point method. Every iteration is
+    one sparse factorization of H plus a diagonal, which is O(n) for the
+    banded curvature matrix, and the iteration count barely grows with n.
+
+    x0 warm-starts the solve (e.g. the previous solution of a slightly
+    changed problem): the active bounds of x0 seed up to warm_iter active
+    set iterations, each a single sparse solve on the free variables. If
+    those do not settle, the interior point method runs from x0.
+    Returns the solution and the number of iterations used.
+    """
+    import scipy.sparse as sp
+    from scipy.sparse.linalg import splu
+
+    n = len(B)
+    lower = np.broadcast_to(np.asarray(lower, dtype=float), (n,))
+    upper = np.broadcast_to(np.asarray(upper, dtype=float), (n,))
+
+    # Normalize so the tolerances do not depend on the coordinate units
+    scale = max(np.abs(H.diagonal()).mean(), np.finfo(float).tiny)
+    H = sp.csc_matrix(H) / scale
+    b = np.asarray(B, dtype=float) / scale
+
+    warm_iterations = 0
+    if x0 is not None and warm_iter > 0:
+        x, warm_iterations, converged = _active_set_resolve(H, b, np.asarray(x0, dtype=float),
+                                                            lower, upper, warm_iter)
+        if converged:
+            return x, warm_iterations
+
+    width = upper - lower
+    if x0 is None:
+        x = lower + 0.5 * width
+    else:
+        # Keep the warm start strictly inside the box
+        x = np.clip(x0, lower + 0.01 * width, upper - 0.01 * width)
+    z_lower = np.ones(n)
+    z_upper = np.ones(n)
+
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        s_lower = x - lower
+        s_upper = upper - x
+        r_dual = H @ x + b - z_lower + z_upper
+        mu = (s_lower @ z_lower + s_upper @ z_upper) / (2 * n)
+        if np.abs(r_dual).max() < tol * (1 + np.abs(b).max()) and mu < tol:
+            break
+
+        lu = splu((H + sp.diags(z_lower / s_lower + z_upper / s_upper)).tocsc())
+
+        def newton_step(target_lower, target_upper):
+            rhs = -r_dual + (target_lower / s_lower - z_lower) - (target_upper / s_upper - z_upper)
+            dx = lu.solve(rhs)
+            dz_lower = (target_lower - s_lower * z_lower - z_lower * dx) / s_lower
+            dz_upper = (target_upper - s_upper * z_upper + z_upper * dx) / s_upper
+            return dx, dz_lower, dz_upper
+
+        # Affine (predictor) step
+        dx, dz_lower, dz_upper = newton_step(np.zeros(n), np.zeros(n))
+        alpha_p = min(_max_step(s_lower, dx), _max_step(s_upper, -dx))
+        alpha_d = min(_max_step(z_lower, dz_lower), _max_step(z_upper, dz_upper))
+        mu_aff = ((s_lower + alpha_p * dx) @ (z_lower + alpha_d * dz_lower) +
+                  (s_upper - alpha_p * dx) @ (z_upper + alpha_d * dz_upper)) / (2 * n)
+        sigma = (mu_aff / mu) ** 3
+
+        # Centering-corrector step reusing the same factorization
+        dx, dz_lower, dz_upper = newton_step(sigma * mu - dx * dz_lower, sigma * mu + dx * dz_upper)
+        alpha_p = 0.995 * min(_max_step(s_lower, dx), _max_step(s_upper, -dx))
+        alpha_d = 0.995 * min(_max_step(z_lower, dz_lower), _max_step(z_upper, dz_upper))
+        x = x + alpha_p * dx
+        z_lower = z_lower + alpha_d * dz_lower
+        z_upper = z_upper + alpha_d * dz_upper
+
+    return x, warm_iterations + iteration
+
+
+def _active_set_resolve(H, b, x0, lower, upper, max_iter, active_tol=1e-5):
+    # Primal-dual active set iterations seeded with the bounds x0 sits on.
+    # Cheap when the active set barely moves, but can cycle from a cold start.
+    from scipy.sparse.linalg import spsolve
+
+    width = upper - lower
+    at_lower = x0 <= lower + active_tol * width
+    at_upper = (x0 >= upper - active_tol * width) & ~at_lower
+    H = H.tocsr()
+
+    x = x0
+    for iteration in range(1, max_iter + 1):
+        active = at_lower | at_upper
+        free = ~active
+        x = np.where(at_lower, lower, np.where(at_upper, upper, 0.0))
+        if free.any():
+            rhs = -b[free] - H[free][:, active] @ x[active]
+            x[free] = spsolve(H[free][:, free].tocsc(), rhs)
+
+        # Release bounds whose multiplier has the wrong sign, add violated ones
+        gradient = H @ x + b
+        new_lower = (at_lower & (gradient >= 0)) | (free & (x < lower))
+        new_upper = ((at_upper & (gradient <= 0)) | (free & (x > upper))) & ~new_lower
+        if np.array_equal(new_lower, at_lower) and np.array_equal(new_upper, at_upper):
+            return x, iteration, True
+        at_lower, at_upper = new_lower, new_upper
+
+    return x, max_iter, False
+
+
+def _max_step(v, dv):
+    # Largest step in (0, 1] keeping v + step * dv non-negative
+    shrinking = dv < 0
+    if not shrinking.any():
+        return 1.0
+    return min(1.0, (-v[shrinking] / dv[shrinking]).min())
+
+
+def min_curvature_path(outer_boundary, inner_boundary, nseg=1500, solver='sparse', cache=None):
+    """
+    Compute the minimum curvature path between the outer and inner boundaries.
+
+    solver='sparse' assembles H as a sparse pentadiagonal matrix with
+    periodic coupling across the start/finish line and solves the box QP
+    with a sparse interior point method. solver='slsqp' is the original dense
+    formulation (start=end equality row) solved by scipy.optimize.minimize.
+    With a ResultCache, the path is looked up by the boundary geometry,
+    nseg and solver before solving.
+    """
+    if cache is not None:
+        return cache.memoize('min_curvature_path',
+                             lambda: min_curvature_path(outer_boundary, inner_boundary, nseg, solver),
+                             (outer_boundary, inner_boundary), {'nseg': nseg, 'solver': solver})
+
+    # Interpolate boundaries to have the same number of points
+    outer_interp, inner_interp = resample_boundaries(outer_boundary, inner_boundary, nseg)
+
+    # Compute deltas between inner and outer boundaries
+    delx = outer_interp[:, 0] - inner_interp[:, 0]
+    dely = outer_interp[:, 1] - inner_interp[:, 1]
+
+    if solver == 'sparse':
+        # The last sample is the start line again; solve on the unique points
+        # and close the loop through the periodic stencil
+        H, B = assemble_curvature_qp(inner_interp[:-1], delx[:-1], dely[:-1], closed=True)
+        alpha, _ = solve_box_qp(H, B)
+        alpha = np.append(alpha, alpha[0])
+    elif solver == 'slsqp':
+        alpha = _solve_slsqp(inner_interp, delx, dely)
+    else:
+        raise ValueError(f"Unknown solver: {solver}")
+
+    # Compute the minimum curvature path
+    x_res = inner_interp[:, 0] + alpha * delx
+    y_res = inner_interp[:, 1] + alpha * dely
+    return np.column_stack((x_res, y_res))
+
+
+def _solve_slsqp(inner_interp, delx, dely):
+    from scipy.optimize import minimize
+
+    n = len(delx)
+    H, B = assemble_curvature_qp(inner_interp, delx, dely, closed=False)
+    H = H.toarray()
+
+    # Define constraints (start and end points are the same)
+    Aeq = np.zeros((1, n))
+    Aeq[0, 0] = 1
+    Aeq[0, -1] = -1
+    beq = np.array([0])
+
+    # Solve the quadratic programming problem
+    res = minimize(lambda x: 0.5 * x.T @ H @ x + B @ x,
+                   x0=np.zeros(n),
+                   constraints={'type': 'eq', 'fun': lambda x: Aeq @ x - beq},
+                   bounds=[(0, 1)] * n)
+    return res.x
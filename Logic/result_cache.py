@@ -0,0 +1,222 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get('RACING_LINE_CACHE_DIR',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'racing_line'))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MEMORY_ITEMS = 256
+
+# Modules whose source defines the cached results; editing any of them
+# changes the code version and so invalidates every cached entry
+VERSIONED_MODULES = ['min_curvature.py', 'track_curve.py', 'curvature.py', 'final.py',
+                     'speed_profile.py', 'lap_time.py', 'spatial_index.py', 'track_frame.py',
+                     'batch_runner.py']
+
+_code_version = None
+_shared_cache = None
+
+
+def code_version():
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in VERSIONED_MODULES:
+            path = os.path.join(here, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def cache_key(stage, arrays=(), params=None):
+    """
+    Content hash of a computation: stage name, code version, the exact
+    bytes of every input array and the (JSON-serialisable) parameters.
+    """
+    digest = hashlib.sha256()
+    digest.update(stage.encode())
+    digest.update(code_version().encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _encode(value):
+    # Arrays, tuples/lists of arrays and dicts of arrays/scalars as .npz fields
+    if isinstance(value, np.ndarray):
+        return {'kind': 'array'}, {'value': value}
+    if isinstance(value, (tuple, list)):
+        return {'kind': 'sequence', 'length': len(value)}, {f'item{i}': np.asarray(v) for i, v in enumerate(value)}
+    if isinstance(value, dict):
+        return {'kind': 'dict', 'keys': list(value)}, {f'key{i}': np.asarray(v) for i, v in enumerate(value.values())}
+    raise TypeError(f"Cannot cache values of type {type(value).__name__}")
+
+
+def _frozen(value):
+    # Read-only copy of a cached value, so no caller can modify the entry other callers get
+    def freeze(a):
+        if not isinstance(a, np.ndarray):
+            return a
+        a = a.copy()
+        a.flags.writeable = False
+        return a
+
+    if isinstance(value, (tuple, list)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return {key: freeze(v) for key, v in value.items()}
+    return freeze(value)
+
+
+def _decode(meta, fields):
+    def scalar(a):
+        return a.item() if a.ndim == 0 else a
+
+    if meta['kind'] == 'array':
+        return fields['value']
+    if meta['kind'] == 'sequence':
+        return tuple(scalar(fields[f'item{i}']) for i in range(meta['length']))
+    return {key: scalar(fields[f'key{i}']) for i, key in enumerate(meta['keys'])}
+
+
+def shared_cache():
+    """
+    The process-wide ResultCache on DEFAULT_CACHE_DIR, created on first
+    use. Scripts and backend workers share its disk tier and keep their
+    own memory tier for the life of the process.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResultCache()
+    return _shared_cache
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache for pipeline results.
+
+    Entries live in memory (bounded by item count) and on disk as .npz files
+    named by their content hash (bounded by total size; the least recently
+    used files are evicted first). Values must be NumPy arrays, tuples of
+    arrays or dicts of arrays and scalars. The memory tier keeps read-only
+    copies, so arrays returned from it must be copied before modifying.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 memory_items=DEFAULT_MEMORY_ITEMS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.directory is not None:
+            self._store(key, value)
+            self._evict()
+
+    def memoize(self, stage, compute, arrays=(), params=None):
+        """
+        Return the cached result of compute() for these inputs, computing
+        and storing it on a miss.
+        """
+        key = cache_key(stage, arrays, params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key, value):
+        self._memory[key] = _frozen(value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                fields = {name: data[name] for name in data.files}
+            os.utime(path)  # Mark as recently used for the LRU eviction
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        meta = json.loads(fields.pop('__meta__').item())
+        return _decode(meta, fields)
+
+    def _store(self, key, value):
+        meta, fields = _encode(value)
+        buffer = io.BytesIO()
+        np.savez(buffer, __meta__=np.array(json.dumps(meta)), **fields)
+
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f'{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self._path(key))
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
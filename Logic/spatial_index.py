@@ -0,0 +1,45 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class TrackIndex:
+    """
+    KD-tree over one track polyline (boundary, center line or apex set).
+
+    Build it once per line and reuse it for every nearest-neighbour lookup,
+    so m queries cost O(m log n) without allocating an m x n distance matrix.
+    """
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.dims = self.points.shape[1] if self.points.ndim == 2 else 2
+        self.tree = cKDTree(self.points) if len(self.points) else None
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, queries, max_distance=None):
+        """
+        Batched nearest point lookup. Returns (distances, indices); queries
+        with no point closer than max_distance get distance inf and index -1.
+        """
+        queries = np.asarray(queries, dtype=float).reshape(-1, self.dims)
+        if self.tree is None or len(queries) == 0:
+            return np.full(len(queries), np.inf), np.full(len(queries), -1, dtype=int)
+
+        distances, indices = self.tree.query(queries, k=1)
+        if max_distance is not None:
+            too_far = distances >= max_distance
+            distances[too_far] = np.inf
+            indices[too_far] = -1
+        return distances, indices
+
+    def within(self, queries, radius):
+        """
+        Indices of all track points within radius of each query point.
+        """
+        queries = np.asarray(queries, dtype=float).reshape(-1, self.dims)
+        if self.tree is None:
+            return [[] for _ in range(len(queries))]
+        return self.tree.query_ball_point(queries, r=radius)
+
@@ -0,0 +1,194 @@
+import numpy as np
+from track_curve import path_curvature
+from track_frame import track_frame
+
+GRAVITY = 9.81
+
+# Point-mass car: grip factors are multiples of friction * g (aero included)
+DEFAULT_VEHICLE = {
+    'max_speed': 95.0,      # m/s
+    'lateral_grip': 3.5,    # cornering, in friction * g
+    'brake_grip': 4.0,      # braking, in friction * g
+    'max_accel': 1.2,       # traction/power limited, in g
+}
+
+
+def to_metres(path):
+    # Project a lon/lat path into its track frame (lon/lat in, metres out)
+    return track_frame(path).forward(path)
+
+
+def segment_lengths(path_m, closed=True):
+    # Length of every segment; a closed lap also has the segment back to the start
+    nxt = np.roll(path_m, -1, axis=0) if closed else path_m[1:]
+    return np.hypot(*(nxt - path_m[:len(nxt)]).T)
+
+
+def friction_along_path(path, friction_grid, x_min, x_max, y_min, y_max, default=1.0):
+    """
+    Nearest-cell lookup of a friction grid (rows = y, columns = x) at every
+    path point. Cells outside the track (NaN) and points off the grid get
+    the default friction.
+    """
+    rows, cols = friction_grid.shape
+    col = np.rint((path[:, 0] - x_min) / (x_max - x_min) * (cols - 1)).astype(int)
+    row = np.rint((path[:, 1] - y_min) / (y_max - y_min) * (rows - 1)).astype(int)
+    inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+
+    friction = np.full(len(path), float(default))
+    friction[inside] = friction_grid[row[inside], col[inside]]
+    friction[np.isnan(friction)] = default
+    return friction
+
+
+def forward_pass(v2_limit, ds, accel):
+    """
+    Acceleration pass over squared speed: v2[j] = min over i <= j of
+    v2_limit[i] + 2 * sum(accel[k] * ds[k], k = i..j-1). Evaluated in one
+    vectorized step with a running minimum instead of a Python loop.
+    """
+    work = np.concatenate([[0.0], np.cumsum(2 * accel * ds)])[:len(v2_limit)]
+    return work + np.minimum.accumulate(v2_limit - work)
+
+
+def backward_pass(v2_limit, ds, brake):
+    # Braking pass: the forward pass run on the reversed lap
+    return forward_pass(v2_limit[::-1], ds[::-1], brake[::-1])[::-1]
+
+
+def grip_limits(ds, curvature, friction=1.0, vehicle=None):
+    # Cornering speed limit (squared) per sample, and acceleration/braking limits per segment
+    vehicle = {**DEFAULT_VEHICLE, **(vehicle or {})}
+    n = len(curvature)
+    mu = np.broadcast_to(np.asarray(friction, dtype=float), (n,))
+
+    lateral = mu * GRAVITY * vehicle['lateral_grip']
+    with np.errstate(divide='ignore'):
+        v2_limit = np.minimum(lateral / np.abs(curvature), vehicle['max_speed'] ** 2)
+
+    accel = np.minimum(vehicle['max_accel'] * GRAVITY, lateral)[:len(ds)]
+    brake = (mu * GRAVITY * vehicle['brake_grip'])[:len(ds)]
+    return lateral, v2_limit, accel, brake
+
+
+def reversed_segments(values, closed=True):
+    # Per-segment values in the order a reversed lap traverses them
+    return np.roll(values[::-1], -1) if closed else values[::-1]
+
+
+def speed_profile(ds, curvature, friction=1.0, vehicle=None, closed=True):
+    """
+    Quasi-steady-state speed profile along a line.
+
+    ds are the segment lengths in metres (len(curvature) segments for a
+    closed lap, one less for an open line), curvature is in 1/m and friction
+    is a scalar or one coefficient per sample. Returns a dict with the
+    distance, speed limit, speed, lateral grip usage (0-1), longitudinal
+    acceleration and lap time, plus the squared speeds of both passes for
+    update_speed_profile.
+    """
+    n = len(curvature)
+    lateral, v2_limit, accel, brake = grip_limits(ds, curvature, friction, vehicle)
+
+    if closed:
+        # Two laps back to back make the start speed consistent with the end of the lap
+        v2_fwd = forward_pass(np.tile(v2_limit, 2), np.tile(ds, 2)[:-1], np.tile(accel, 2)[:-1])[n:]
+        v2_bwd = backward_pass(np.tile(v2_limit, 2), np.tile(ds, 2)[:-1], np.tile(brake, 2)[:-1])[:n]
+    else:
+        v2_fwd = forward_pass(v2_limit, ds, accel)
+        v2_bwd = backward_pass(v2_limit, ds, brake)
+    return _profile(ds, curvature, lateral, v2_limit, v2_fwd, v2_bwd)
+
+
+def _profile(ds, curvature, lateral, v2_limit, v2_fwd, v2_bwd):
+    n = len(curvature)
+    speed = np.sqrt(np.minimum(v2_fwd, v2_bwd))
+
+    # Per-segment acceleration and time
+    v_next = np.roll(speed, -1)[:len(ds)]
+    v_here = speed[:len(ds)]
+    moving = ds > 0
+    acceleration = np.zeros(len(ds))
+    acceleration[moving] = (v_next[moving] ** 2 - v_here[moving] ** 2) / (2 * ds[moving])
+    segment_time = np.zeros(len(ds))
+    segment_time[moving] = 2 * ds[moving] / (v_here[moving] + v_next[moving])
+
+    return {
+        'distance': np.concatenate([[0.0], np.cumsum(ds)])[:n],
+        'speed_limit': np.sqrt(v2_limit),
+        'speed': speed,
+        'grip_usage': np.minimum(speed ** 2 * np.abs(curvature) / lateral, 1.0),
+        'acceleration': acceleration,
+        'segment_time': segment_time,
+        'lap_time': segment_time.sum(),
+        'v2_forward': v2_fwd,
+        'v2_backward': v2_bwd,
+    }
+
+
+def _repropagate(v2_old, v2_limit, ds, accel, first, last, closed):
+    """
+    Forward pass re-run from sample first onwards, after the limits of
+    samples first..last changed. Starts from the unchanged speed before
+    first and stops as soon as it meets the previous solution past last,
+    doubling the window until it does. Returns None if the change reaches
+    all the way round a closed lap.
+    """
+    n = len(v2_limit)
+    start = first - 1 if closed or first > 0 else 0
+    changed = last - start
+    window = changed + 64
+
+    while True:
+        if closed and window >= n:
+            return None
+        stop = start + window if closed else min(start + window, n - 1)
+        idx = np.arange(start, stop + 1) % n
+        limits = v2_limit[idx]
+        if start < first:
+            limits[0] = v2_old[idx[0]]
+        new = forward_pass(limits, ds[idx[:-1]], accel[idx[:-1]])
+
+        settled = np.flatnonzero(new[changed + 1:] == v2_old[idx[changed + 1:]])
+        if len(settled) or not closed and stop == n - 1:
+            end = changed + 1 + settled[0] if len(settled) else len(idx)
+            v2 = v2_old.copy()
+            v2[idx[:end]] = new[:end]
+            return v2
+        window *= 2
+
+
+def update_speed_profile(profile, ds, curvature, friction, changed, vehicle=None, closed=True):
+    """
+    Speed profile after the friction of some samples changed, given the
+    previous profile of the same line. Only the stretch from the first to
+    the last changed sample, and outward until the speed meets the old
+    solution again, is re-run through the forward and backward passes.
+    changed is a boolean mask or index array of the samples whose friction
+    changed; friction holds the new value of every sample.
+    """
+    changed = np.flatnonzero(np.asarray(changed)) if np.asarray(changed).dtype == bool else np.asarray(changed)
+    if len(changed) == 0:
+        return profile
+    n = len(curvature)
+    first, last = int(changed.min()), int(changed.max())
+    lateral, v2_limit, accel, brake = grip_limits(ds, curvature, friction, vehicle)
+
+    v2_fwd = _repropagate(profile['v2_forward'], v2_limit, ds, accel, first, last, closed)
+    v2_bwd = _repropagate(profile['v2_backward'][::-1], v2_limit[::-1], reversed_segments(ds, closed),
+                          reversed_segments(brake, closed), n - 1 - last, n - 1 - first, closed)
+    if v2_fwd is None or v2_bwd is None:
+        return speed_profile(ds, curvature, friction, vehicle, closed)
+    return _profile(ds, curvature, lateral, v2_limit, v2_fwd, v2_bwd[::-1])
+
+
+def path_speed_profile(path, friction=1.0, vehicle=None, closed=True, metric=False):
+    """
+    Speed profile of a lon/lat racing line, using its analytic curvature.
+    With metric=True the path is already in track frame metres.
+    """
+    path = np.asarray(path, dtype=float)
+    path_m = path if metric else to_metres(path)
+    ds = segment_lengths(path_m, closed=closed)
+    kappa = path_curvature(path_m, closed=closed)
+    return speed_profile(ds, kappa, friction=friction, vehicle=vehicle, closed=closed)
@@ -0,0 +1,106 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+from track_frame import metres_per_degree, track_frame
+
+
+def signed_curvature(d1, d2):
+    # Curvature of a planar curve from its first and second derivatives (any parameter)
+    cross = d1[..., 0] * d2[..., 1] - d1[..., 1] * d2[..., 0]
+    return cross / np.hypot(d1[..., 0], d1[..., 1]) ** 3
+
+
+class TrackCurve:
+    """
+    Cubic spline through a track polyline, parameterised by arc length.
+
+    Both coordinates share one spline, so the curve can be re-sampled at
+    any resolution and differentiated analytically without refitting.
+    With closed=True the spline is periodic and has no kink at the
+    start/finish seam.
+    """
+
+    def __init__(self, points, closed=True):
+        points = np.asarray(points, dtype=float)
+        if closed and not np.array_equal(points[0], points[-1]):
+            points = np.vstack([points, points[:1]])
+
+        # Arc length in one pass; drop repeated points so it is strictly increasing
+        seg_len = np.hypot(*np.diff(points, axis=0).T)
+        points = points[np.concatenate([[True], seg_len > 0])]
+        arc = np.concatenate([[0.0], np.cumsum(seg_len[seg_len > 0])])
+
+        self.closed = closed
+        self.reference_latitude = points[:, 1].mean()
+        self.length = arc[-1]
+        self.knots = arc
+        self.spline = CubicSpline(arc, points, axis=0, bc_type='periodic' if closed else 'not-a-knot')
+
+    def parameters(self, n_points):
+        # Evenly spaced arc-length stations including both ends
+        return np.linspace(0, self.length, n_points)
+
+    def evaluate(self, s, derivative=0):
+        s = np.asarray(s, dtype=float)
+        if self.closed:
+            s = np.mod(s, self.length)
+        return self.spline(s, derivative)
+
+    def sample(self, n_points):
+        return self.evaluate(self.parameters(n_points))
+
+    def derivatives(self, s):
+        # First and second derivatives with respect to arc length
+        return self.evaluate(s, 1), self.evaluate(s, 2)
+
+    def curvature(self, s, metric=False):
+        """
+        Signed curvature at arc-length stations s, evaluated analytically from
+        the spline derivatives. With metric=True the derivatives of a lon/lat
+        curve are scaled to metres with the local scale at its mean latitude,
+        so the result is approximately in 1/m; curves fitted to track frame
+        coordinates (see track_frame) are already metric.
+        """
+        d1, d2 = self.derivatives(s)
+        if metric:
+            scale = metres_per_degree(self.reference_latitude)
+            d1, d2 = d1 * scale, d2 * scale
+        return signed_curvature(d1, d2)
+
+
+def path_curvature(points, closed=True, metric=False):
+    """
+    Curvature at every sample of a polyline, from a spline fitted through it.
+    With metric=True the lon/lat polyline is projected into its track frame
+    first, so the result is in 1/m.
+    """
+    points = np.asarray(points, dtype=float)
+    if metric:
+        points = track_frame(points).forward(points)
+    arc = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+    return TrackCurve(points, closed=closed).curvature(arc)
+
+
+def batch_curvature(tracks, n_points=1000, closed=True, metric=False):
+    """
+    Curvature of many tracks at once. Every track is resampled linearly to
+    n_points on a common normalised arc-length grid, then a single
+    vector-valued spline is fitted and differentiated for all of them.
+    Returns the (n_tracks, n_points) curvature and the resampled points.
+    With metric=True every lon/lat track is projected into its track frame
+    first; the curvature is then in 1/m and the points in metres.
+    """
+    u = np.linspace(0, 1, n_points)
+    stacked = np.empty((n_points, len(tracks), 2))
+    for t, points in enumerate(tracks):
+        points = np.asarray(points, dtype=float)
+        if metric:
+            points = track_frame(points).forward(points)
+        if closed and not np.array_equal(points[0], points[-1]):
+            points = np.vstack([points, points[:1]])
+        arc = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+        stacked[:, t, 0] = np.interp(u * arc[-1], arc, points[:, 0])
+        stacked[:, t, 1] = np.interp(u * arc[-1], arc, points[:, 1])
+
+    spline = CubicSpline(u, stacked, axis=0, bc_type='periodic' if closed else 'not-a-knot')
+    d1, d2 = spline(u, 1), spline(u, 2)
+    return signed_curvature(d1, d2).T, stacked.transpose(1, 0, 2)
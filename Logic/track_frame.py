@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+# Frames are shared by every line of a circuit whose bounding box centre rounds to the same origin
+ORIGIN_DECIMALS = 3
+MAX_FRAMES = 64  # Most recently used frames kept (one per circuit)
+_frames = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def metres_per_degree(latitude):
+    # Local equirectangular scale for (longitude, latitude) at the given latitude
+    lat_scale = np.radians(1.0) * EARTH_RADIUS_M
+    return np.stack([lat_scale * np.cos(np.radians(latitude)), np.full(np.shape(latitude), lat_scale)], axis=-1)
+
+
+class TrackFrame:
+    """
+    Local metric (east, north) frame of one track, in metres.
+
+    Lon/lat points are projected onto the plane tangent to the sphere at
+    the origin (orthographic projection, the horizontal part of ENU), so
+    distances and curvature are in metres and 1/m everywhere on the
+    track, independent of its latitude. Over a circuit a few km across the
+    scale error is below 1e-6. forward() and inverse() are vectorized over
+    any [..., 2] array and inverse() is exact.
+    """
+
+    def __init__(self, origin):
+        self.origin = np.asarray(origin, dtype=float)
+        self._lon0, self._lat0 = np.radians(self.origin)
+        self._sin_lat0, self._cos_lat0 = np.sin(self._lat0), np.cos(self._lat0)
+
+    @classmethod
+    def for_points(cls, points):
+        # Frame centred on the bounding box of lon/lat points
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        return cls((points.min(axis=0) + points.max(axis=0)) / 2)
+
+    def forward(self, points):
+        # [..., 2] lon/lat in degrees -> [..., 2] east/north in metres
+        points = np.asarray(points, dtype=float)
+        lon = np.radians(points[..., 0]) - self._lon0
+        lat = np.radians(points[..., 1])
+        cos_lat = np.cos(lat)
+        east = EARTH_RADIUS_M * cos_lat * np.sin(lon)
+        north = EARTH_RADIUS_M * (self._cos_lat0 * np.sin(lat) - self._sin_lat0 * cos_lat * np.cos(lon))
+        return np.stack([east, north], axis=-1)
+
+    def inverse(self, points):
+        # [..., 2] east/north in metres -> [..., 2] lon/lat in degrees
+        points = np.asarray(points, dtype=float)
+        east, north = points[..., 0], points[..., 1]
+        rho = np.hypot(east, north)
+        c = np.arcsin(np.minimum(rho / EARTH_RADIUS_M, 1.0))
+        sin_c, cos_c = np.sin(c), np.cos(c)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(rho > 0, north * sin_c / rho, 0.0)
+        lat = np.arcsin(cos_c * self._sin_lat0 + ratio * self._cos_lat0)
+        lon = self._lon0 + np.arctan2(east * sin_c, rho * cos_c * self._cos_lat0 - north * sin_c * self._sin_lat0)
+        return np.stack([np.degrees(lon), np.degrees(lat)], axis=-1)
+
+
+def track_frame(points):
+    """
+    The shared TrackFrame of the track containing these lon/lat points.
+
+    Frames are cached by their rounded origin, so the boundaries, centre
+    line and racing line of one circuit are all projected with the same
+    frame (and the projection set-up runs once per circuit). At most
+    MAX_FRAMES frames are kept, least recently used dropped first; a
+    dropped frame is rebuilt identically from the same origin.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    centre = np.round((points.min(axis=0) + points.max(axis=0)) / 2, ORIGIN_DECIMALS)
+    key = tuple(centre)
+    with _frames_lock:
+        frame = _frames.get(key)
+        if frame is None:
+            frame = _frames[key] = TrackFrame(centre)
+            while len(_frames) > MAX_FRAMES:
+                _frames.popitem(last=False)
+        else:
+            _frames.move_to_end(key)
+    return frame
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+# A track store is a directory of raw .npy arrays plus a JSON metadata file.
+# Uncompressed .npy files can be memory-mapped, so loading is O(1) and every
+# process that opens the same store shares one copy through the page cache.
+TRACK_SUFFIX = '.track'
+METADATA_FILE = 'metadata.json'
+
+
+def is_track_store(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, METADATA_FILE))
+
+
+def save_track(path, arrays, metadata=None):
+    """
+    Write arrays (name -> array, None entries are skipped) and a metadata
+    dict to a track store directory. Existing arrays of the same name are
+    replaced; others already in the store are kept. Every file is written
+    under a temporary name and renamed over the old one, so readers that
+    have the store memory-mapped keep their old file and never see a
+    partial one.
+    """
+    os.makedirs(path, exist_ok=True)
+    stored = load_metadata(path) if is_track_store(path) else {'arrays': {}}
+
+    for name, array in arrays.items():
+        if array is None:
+            continue
+        array = np.ascontiguousarray(array, dtype=float)
+        target = os.path.join(path, f'{name}.npy')
+        tmp_path = f'{target}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp_path, target)
+        stored['arrays'][name] = list(array.shape)
+
+    # Metadata last, so it never lists an array before the array is in place
+    stored.update(metadata or {})
+    target = os.path.join(path, METADATA_FILE)
+    tmp_path = f'{target}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(stored, f, indent=2)
+    os.replace(tmp_path, target)
+
+
+def load_metadata(path):
+    with open(os.path.join(path, METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def load_track(path, names=None, mmap=True):
+    """
+    Load arrays from a track store. With mmap=True the arrays are read-only
+    memory-mapped views of the files (nothing is read until it is touched);
+    copy them before modifying. Missing names are None.
+    """
+    available = load_metadata(path)['arrays']
+    arrays = {}
+    for name in names or available:
+        if name in available:
+            arrays[name] = np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+        else:
+            arrays[name] = None
+    return arrays
+
+
+def read_track_csv(csv_file):
+    """
+    Vectorized reader for track_paths.csv (inner/outer/center lon/lat
+    columns). A row with a missing or malformed value in any of the
+    columns present is dropped from every boundary, like the row-by-row
+    loaders do, so the boundaries stay aligned row for row.
+    """
+    table = np.genfromtxt(csv_file, delimiter=',', names=True, dtype=float, encoding='utf-8')
+    table = np.atleast_1d(table)
+
+    boundaries = {}
+    for name in ('inner', 'outer', 'center'):
+        columns = (f'{name}_lon', f'{name}_lat')
+        if all(column in table.dtype.names for column in columns):
+            boundaries[name] = np.column_stack([table[column] for column in columns])
+
+    valid = np.ones(len(table), dtype=bool)
+    for points in boundaries.values():
+        valid &= np.isfinite(points).all(axis=1)
+    return {name: points[valid] for name, points in boundaries.items()}
+
+
+def read_apex_csv(csv_file):
+    # Apex CSV (longitude, latitude and optionally curvature) -> points, |curvature|
+    table = np.atleast_1d(np.genfromtxt(csv_file, delimiter=',', names=True, dtype=None, encoding='utf-8'))
+    points = np.column_stack([table['longitude'], table['latitude']]).astype(float)
+    if 'curvature' in table.dtype.names:
+        curvature = np.abs(table['curvature'].astype(float))
+    else:
+        curvature = np.ones(len(points))
+    valid = np.isfinite(points).all(axis=1)
+    return points[valid].reshape(-1, 2), curvature[valid]
+
+
+def read_line_csv(csv_file):
+    # Racing line CSV as written by np.savetxt (longitude,latitude header)
+    return np.loadtxt(csv_file, delimiter=',', skiprows=1, ndmin=2)
+
+
+def convert_track(source, destination=None, apex_csv=None, racing_line_csv=None):
+    """
+    Convert a track CSV or KML (plus optional apex and racing line CSVs) to
+    a track store. Returns the store path.
+    """
+    if destination is None:
+        destination = os.path.splitext(source)[0] + TRACK_SUFFIX
+
+    if source.lower().endswith('.kml'):
+        from kml_reader import read_track_kml
+        outer, inner = read_track_kml(source)
+        arrays = {'inner': inner, 'outer': outer}
+    else:
+        arrays = read_track_csv(source)
+
+    if apex_csv is not None:
+        arrays['apex'], arrays['apex_curvature'] = read_apex_csv(apex_csv)
+    if racing_line_csv is not None:
+        arrays['racing_line'] = read_line_csv(racing_line_csv)
+
+    save_track(destination, arrays, {'source': os.path.basename(source), 'created': time.time()})
+    return destination
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a track CSV/KML to a memory-mappable track store.")
+    parser.add_argument('source', help="Track CSV (track_paths.csv layout) or KML file")
+    parser.add_argument('-o', '--output', help=f"Store directory (default: source name + {TRACK_SUFFIX})")
+    parser.add_argument('--apex', help="Apex points CSV to include")
+    parser.add_argument('--racing-line', help="Racing line CSV to include")
+    args = parser.parse_args()
+
+    destination = convert_track(args.source, args.output, apex_csv=args.apex, racing_line_csv=args.racing_line)
+    metadata = load_metadata(destination)
+    print(f"Wrote {destination}")
+    for name, shape in metadata['arrays'].items():
+        print(f"  {name:<15} {tuple(shape)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,46 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, url_for
 from flask_cors import CORS
 import logging
+import os
+import uuid
 import joblib
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
+from werkzeug.utils import secure_filename
 import pickle
+from circuit_processor import CIRCUIT_EXTENSIONS, CircuitJobs, QueueFull, render_racing_line, speed_trace
+from friction_session import FrictionSessions
+from prediction_service import PredictionService, model_version
+from session_store import SessionStore
+from track_catalog import TrackCatalog
+import threading
 
 app = Flask(__name__)
 CORS(app)
 
 logging.basicConfig(level=logging.DEBUG)
 
+UPLOAD_FOLDER = os.path.join(app.static_folder, 'uploads')
+IMAGE_FOLDER = os.path.join(app.static_folder, 'processed_images')
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+os.makedirs(IMAGE_FOLDER, exist_ok=True)
+app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
+
+# Racing line solves run in worker processes, never on the request thread
+circuit_jobs = CircuitJobs(max_workers=int(os.environ.get('CIRCUIT_WORKERS', 2)),
+                           max_pending=int(os.environ.get('CIRCUIT_MAX_PENDING', 16)))
+# Friction maps and racing lines of recently edited circuits, kept between edits
+friction_sessions = FrictionSessions(max_sessions=int(os.environ.get('FRICTION_SESSIONS', 8)))
+
+# Circuits and past winners, loaded and indexed once
+track_catalog = TrackCatalog()
+TRACKS_MAX_AGE = 300  # Seconds browsers may reuse /api/tracks and /api/winners responses
+
+MODEL_PATH = os.environ.get('MODEL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      'models', 'f1_q3_model.pkl'))
+
 try:
-    with open('f1_q3_model.pkl', 'rb') as f:
+    with open(MODEL_PATH, 'rb') as f:
         model = pickle.load(f)
     
     drivers = [
@@ -27,6 +55,11 @@ try:
     
     le = LabelEncoder()
     le.fit(drivers)
+
+    # Predictions for every cached race, memoized per model version and warmed in the background;
+    # features are read from the session store (`python session_store.py`) where it has the race
+    predictions = PredictionService(model, le, model_version(MODEL_PATH), store=SessionStore())
+    threading.Thread(target=predictions.warm, daemon=True).start()
     
     logging.info("Model and drivers loaded successfully")
 except Exception as e:
@@ -46,80 +79,169 @@ def predict_q3():
         if not race:
             return jsonify({'error': 'No race provided'}), 400
 
-        q1_time = 90.0  
-        q2_time = 88.5  
-        
-        features = np.array([[q1_time, q2_time]])
-        
-        if hasattr(model, 'predict_proba'):
-            proba = model.predict_proba(features)[0]
-            top_10_indices = np.argsort(proba)[-10:][::-1]
-            predictions = [
-                {
-                    'position': i + 1,
-                    'driver': le.inverse_transform([top_10_indices[i]])[0],
-                    'probability': float(proba[top_10_indices[i]])
-                }
-                for i in range(10)
-            ]
-        else:
-            # Fallback to simple prediction if no probability available
-            pred = model.predict(features)
-            predictions = [
-                {'position': i + 1, 'driver': drivers[i], 'probability': (10 - i) / 10}
-                for i in range(10)
-            ]
+        key = predictions.find_race(race, data.get('year'))
+        if key is None:
+            return jsonify({'error': f"No cached qualifying data for {race}"}), 404
 
-        return jsonify({'predictions': predictions})
+        result = predictions.predict(key)
+        return jsonify({'year': key[0], **result})
 
     except Exception as e:
         logging.error(f"Prediction error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict/season', methods=['GET', 'POST'])
+def predict_season():
+    # Every cached race of a season in one call (one model call for all races not predicted yet)
+    try:
+        data = request.get_json(silent=True) or {}
+        year = data.get('year') or request.args.get('year')
+        years = sorted({key[0] for key in predictions.races()})
+        if not years:
+            return jsonify({'error': 'No cached seasons'}), 404
+        year = int(year) if year else years[-1]
+
+        results = predictions.season(year)
+        if not results:
+            return jsonify({'error': f"No cached races for {year}"}), 404
+        return jsonify({
+            'year': year,
+            'model_version': predictions.version,
+            'races': [{'event': key[1], **result} for key, result in results.items()],
+        })
+
+    except Exception as e:
+        logging.error(f"Season prediction error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/process-circuit', methods=['POST'])
+def process_circuit():
+    try:
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({'error': 'No file provided'}), 400
+
+        filename = secure_filename(upload.filename)
+        if not filename.lower().endswith(CIRCUIT_EXTENSIONS):
+            return jsonify({'error': f"Unsupported file type, expected one of {', '.join(CIRCUIT_EXTENSIONS)}"}), 400
+
+        stored_name = f"{uuid.uuid4().hex}_{filename}"
+        track_file = os.path.join(UPLOAD_FOLDER, stored_name)
+        upload.save(track_file)
+        image_path = os.path.join(IMAGE_FOLDER, f"{os.path.splitext(stored_name)[0]}.png")
+
+        job_id = circuit_jobs.submit(track_file, image_path)
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('circuit_job_status', job_id=job_id),
+        }), 202
+
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logging.error(f"Circuit upload error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/process-circuit/<job_id>', methods=['GET'])
+def circuit_job_status(job_id):
+    state = circuit_jobs.status(job_id)
+    if state is None:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    if state['status'] == 'done':
+        del state['track_file'], state['params']
+        image_name = os.path.basename(state.pop('image_path'))
+        state['result'] = {**state['result'],
+                           'image_url': url_for('static', filename=f'processed_images/{image_name}', _external=True)}
+    elif state['status'] == 'failed':
+        logging.error(f"Circuit job {job_id} failed: {state['error']}")
+    return jsonify(state)
+
+@app.route('/api/update-friction', methods=['POST'])
+def update_friction():
+    try:
+        data = request.json or {}
+        job_id = data.get('job_id')
+        state = circuit_jobs.status(job_id) if job_id else None
+        if state is None or state['status'] != 'done':
+            return jsonify({'error': 'No processed circuit for this job_id'}), 404
+
+        # Sessions start from the job's own racing line, so nothing is solved here before the first edit
+        session = friction_sessions.get(job_id, state['track_file'], state['result']['racing_line'], state['params'])
+        resolve_line = bool(data.get('resolve_line', True))
+        if data.get('undo'):
+            update = session.undo(resolve_line=resolve_line)
+        else:
+            # Brush points as lon/lat, or as pixels in the displayed circuit image
+            if 'points' in data:
+                points = [(float(lon), float(lat)) for lon, lat in data['points']]
+            elif 'lon' in data and 'lat' in data:
+                points = [(float(data['lon']), float(data['lat']))]
+            elif 'x' in data and 'y' in data and data.get('width') and data.get('height'):
+                lon_min, lon_max, lat_min, lat_max = state['result']['image_bounds']
+                u, v = float(data['x']) / float(data['width']), float(data['y']) / float(data['height'])
+                points = [(lon_min + u * (lon_max - lon_min), lat_max - v * (lat_max - lat_min))]
+            else:
+                return jsonify({'error': 'Provide points, lon/lat or x/y with the image width/height'}), 400
+            update = session.paint(points, float(data.get('friction_value', 1.0)), radius=data.get('radius'),
+                                   resolve_line=resolve_line)
+
+        # Redraw the circuit image the frontend reloads
+        with session.lock:
+            output = session.output()
+            render_racing_line(output, state['image_path'])
+            trace = speed_trace(output['profile'])
+        return jsonify({
+            'success': True,
+            'lap_time': float(output['lap_time']),
+            'speed_trace': trace,
+            **update,
+        })
+
+    except Exception as e:
+        logging.error(f"Friction update error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def store_response(kind, filters):
+    # Pre-serialized page of the track catalog, answered with 304 when the client's ETag still matches
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return jsonify({'error': 'offset and limit must not be negative'}), 400
+
+    body, etag, total = track_catalog.response(kind, offset, limit, **filters)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = TRACKS_MAX_AGE
+    response.headers['X-Total-Count'] = str(total)
+    return response.make_conditional(request)
+
 @app.route('/api/tracks', methods=['GET'])
 def get_tracks():
     try:
-        tracks = [
-            {
-                'name': 'Bahrain GP',
-                'country': 'Bahrain',
-                'length': 5.412,
-                'corners': 15,
-                'drsZones': 3,
-                'lapRecord': {
-                    'time': '1:31.447',
-                    'driver': 'Pedro de la Rosa',
-                    'year': 2005
-                },
-                'image': 'https://media.formula1.com/image/upload/f_auto,c_limit,w_1920,q_auto/content/dam/fom-website/2018-redesign-assets/Circuit%20maps%2016x9/Bahrain_Circuit.png.transform/8col/image.png',
-                'pastWinners': [
-                    { 'year': 2024, 'winner': 'Max Verstappen', 'team': 'Red Bull Racing Honda RBPT', 'time': '1:31:44.742' },
-                    { 'year': 2023, 'winner': 'Max Verstappen', 'team': 'Red Bull Racing Honda RBPT', 'time': '1:33:56.736' }
-                ]
-            },
-            {
-                'name': 'Saudi Arabian Grand Prix',
-                'country': 'Saudi Arabia',
-                'length': 6.174,
-                'corners': 27,
-                'drsZones': 3,
-                'lapRecord': {
-                    'time': '1:28.049',
-                    'driver': 'Lewis Hamilton',
-                    'year': 2021
-                },
-                'image': 'https://media.formula1.com/image/upload/f_auto,c_limit,w_1920,q_auto/content/dam/fom-website/2018-redesign-assets/Circuit%20maps%2016x9/Saudi_Arabia_Circuit.png.transform/8col/image.png',
-                'pastWinners': [
-                    { 'year': 2024, 'winner': 'Max Verstappen', 'team': 'Red Bull Racing Honda RBPT', 'time': '1:20:43.273' },
-                    { 'year': 2023, 'winner': 'Sergio Perez', 'team': 'Red Bull Racing Honda RBPT', 'time': '1:21:14.894' }
-                ]
-            },
-            # Add more tracks as needed...
-        ]
-        return jsonify(tracks)
+        return store_response('tracks', {
+            'circuit': request.args.get('circuit'),
+            'year': request.args.get('year', type=int),
+            'driver': request.args.get('driver'),
+            'search': request.args.get('q'),
+        })
     except Exception as e:
         logging.error(f"Error getting tracks: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/winners', methods=['GET'])
+def get_winners():
+    try:
+        return store_response('winners', {
+            'circuit': request.args.get('circuit'),
+            'year': request.args.get('year', type=int),
+            'driver': request.args.get('driver'),
+        })
+    except Exception as e:
+        logging.error(f"Error getting winners: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
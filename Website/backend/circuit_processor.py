@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+LOGIC_DIR = os.environ.get('LOGIC_DIR', os.path.join(BACKEND_DIR, '..', '..', 'Logic'))
+if LOGIC_DIR not in sys.path:
+    sys.path.insert(0, LOGIC_DIR)
+
+CIRCUIT_EXTENSIONS = ('.kml', '.csv')
+SPEED_TRACE_POINTS = 500  # Samples of the speed trace sent to the frontend
+
+
+class QueueFull(Exception):
+    pass
+
+
+def render_racing_line(output, image_path):
+    """
+    Track boundaries and the racing line coloured by speed, written as a
+    PNG. The axes fill the whole image, so image pixels map linearly to
+    the returned [lon_min, lon_max, lat_min, lat_max] bounds.
+    """
+    # A Figure with its own Agg canvas, not pyplot: pyplot's global figure manager is not
+    # thread-safe, and friction edits render on Flask request threads
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+    import numpy as np
+
+    line = output['racing_line']
+    speed_kmh = output['profile']['speed'] * 3.6
+
+    fig = Figure(figsize=(10, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.plot(output['outer'][:, 0], output['outer'][:, 1], 'k-', linewidth=1)
+    ax.plot(output['inner'][:, 0], output['inner'][:, 1], 'k-', linewidth=1)
+    segments = np.stack([line[:-1], line[1:]], axis=1)
+    lc = LineCollection(segments, cmap='plasma', linewidth=2)
+    lc.set_array(speed_kmh[:len(segments)])
+    ax.add_collection(lc)
+    fig.colorbar(lc, cax=ax.inset_axes([0.02, 0.05, 0.015, 0.3]), label='Speed (km/h)')
+    ax.text(0.02, 0.97, f"Lap time {output['lap_time']:.2f} s", transform=ax.transAxes, va='top', fontsize=12)
+    ax.set_aspect('equal', adjustable='datalim')
+    ax.axis('off')
+    ax.apply_aspect()
+    bounds = [*ax.get_xlim(), *ax.get_ylim()]
+    fig.savefig(image_path, dpi=100)
+    return [float(b) for b in bounds]
+
+
+def speed_trace(profile):
+    # Distance (m) and speed (km/h), downsampled to about SPEED_TRACE_POINTS samples
+    import numpy as np
+
+    step = max(1, -(-len(profile['speed']) // SPEED_TRACE_POINTS))
+    return {
+        'distance': np.round(profile['distance'][::step], 1).tolist(),
+        'speed': np.round(profile['speed'][::step] * 3.6, 1).tolist(),
+    }
+
+
+def process_circuit(track_file, image_path, params=None):
+    """
+    Worker entry point: parse -> racing line -> speed profile for one
+    uploaded circuit (see Logic/batch_runner.run_pipeline), plus a PNG of
+    the result. Pipeline stages go through the worker's shared
+    ResultCache. Returns a JSON-ready dict.
+    """
+    from batch_runner import DEFAULT_PARAMS, run_pipeline
+    from result_cache import shared_cache
+
+    # Stages are cached by track geometry and parameters (not the upload's name), so a
+    # circuit that was processed before only pays for parsing and rendering
+    output = run_pipeline(track_file, {**DEFAULT_PARAMS, **(params or {})}, cache=shared_cache())
+    bounds = render_racing_line(output, image_path)
+
+    return {
+        'lap_time': float(output['lap_time']),
+        'racing_line': output['racing_line'].tolist(),
+        'apex_points': output['apex_points'].tolist(),
+        'speed_trace': speed_trace(output['profile']),
+        'image_bounds': bounds,
+        'timings': output['timings'],
+    }
+
+
+class CircuitJobs:
+    """
+    Circuit processing jobs on a bounded process pool.
+
+    submit() returns a job id immediately; at most max_workers circuits are
+    solved in parallel and at most max_pending jobs may wait or run at once
+    (submit() raises QueueFull beyond that). Finished jobs are kept for
+    keep_seconds so their results can be polled.
+    """
+
+    def __init__(self, max_workers=2, max_pending=16, keep_seconds=3600):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.keep_seconds = keep_seconds
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Started on first use, so importing the app does not start workers. Workers are
+        # spawned, not forked: by then the app has request and warm-up threads whose
+        # held locks a forked child would inherit and could deadlock on
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _expire(self, now):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished'] is not None and now - job['finished'] > self.keep_seconds]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, track_file, image_path, params=None):
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            if sum(not job['future'].done() for job in self._jobs.values()) >= self.max_pending:
+                raise QueueFull(f"{self.max_pending} circuits are already being processed")
+
+            job_id = uuid.uuid4().hex
+            future = self._pool().submit(process_circuit, track_file, image_path, params)
+            self._jobs[job_id] = {'future': future, 'submitted': now, 'finished': None,
+                                  'track_file': track_file, 'image_path': image_path, 'params': params}
+        future.add_done_callback(lambda _: self._finished(job_id))
+        return job_id
+
+    def _finished(self, job_id):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]['finished'] = time.time()
+
+    def status(self, job_id):
+        """
+        Job state as a dict: status is 'queued', 'running', 'done' or
+        'failed', with the result, upload, image path and parameters (done)
+        or the error message (failed).
+        Returns None for unknown or expired jobs.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        future = job['future']
+        state = {'job_id': job_id, 'submitted': job['submitted']}
+        if not future.done():
+            state['status'] = 'running' if future.running() else 'queued'
+        elif future.exception() is not None:
+            error = future.exception()
+            state.update(status='failed', error=f"{type(error).__name__}: {error}")
+        else:
+            state.update(status='done', result=future.result(), track_file=job['track_file'],
+                         image_path=job['image_path'], params=job['params'])
+        return state
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
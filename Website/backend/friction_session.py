@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import circuit_processor  # noqa: F401  (puts Logic/ on sys.path)
+
+FRICTION_CELL_SIZE = 2.0  # Friction map cell size, metres
+BRUSH_RADIUS = 10.0  # Default brush radius, metres
+UPDATE_ITERATIONS = 3  # Warm-started iterations after a friction change
+
+
+class FrictionSession:
+    """
+    Friction map and lap time racing line of one processed circuit, kept
+    in memory between friction edits.
+
+    The session starts from the racing line the circuit job computed (no
+    solve on the request thread), and the map starts at the job's friction
+    everywhere on the track. Every edit is a brush stroke on the map; only
+    racing line samples on changed cells get new friction and the speed
+    profile is updated incrementally from those samples outward. The line
+    itself follows the job's method: a 'lap_time' line is re-solved
+    warm-started from its previous alpha with weights from the updated
+    profile, while the other methods do not depend on friction and keep
+    their line. The whole line is solved in track frame metres.
+    """
+
+    def __init__(self, track_file, line, params=None, cell_size=FRICTION_CELL_SIZE):
+        from batch_runner import DEFAULT_PARAMS, load_boundaries, sample_count
+        from friction_brush import FrictionBrush
+        from friction_field import FrictionField
+        from track_curve import TrackCurve
+        from track_frame import metres_per_degree, track_frame
+
+        params = {**DEFAULT_PARAMS, **(params or {})}
+        self.method = params['method']
+        self.base_friction = float(params['friction'])
+        inner, outer, _ = load_boundaries(track_file)
+        self.inner, self.outer = np.asarray(inner), np.asarray(outer)
+        self.frame = track_frame(self.outer)
+        self.inner_m, self.outer_m = self.frame.forward(self.inner), self.frame.forward(self.outer)
+        self.nseg = sample_count(TrackCurve(self.outer_m).length, params['segment_spacing'], params['nseg'])
+        self.vehicle = params.get('vehicle')
+
+        field = FrictionField(self.outer, self.inner, cell_size=cell_size,
+                              control_values=np.full(len(self.outer) + len(self.inner), self.base_friction))
+        self.x, self.y = field.x, field.y
+        self.grid = field.grid(fill=np.nan)
+        self.brush = FrictionBrush(self.grid, field.mask, self.x, self.y, BRUSH_RADIUS,
+                                   scale=metres_per_degree(self.y.mean()))
+        self.lock = threading.Lock()
+
+        line_m = self.frame.forward(np.asarray(line, dtype=float))
+        self._set_line(line_m, self._alpha_of(line_m), None)
+
+    def _cells(self, path_m):
+        # Flat friction map cell of every path sample (nearest cell), -1 off the map
+        lon, lat = self.frame.inverse(path_m).T
+        col = np.rint((lon - self.x[0]) / (self.x[1] - self.x[0])).astype(int)
+        row = np.rint((lat - self.y[0]) / (self.y[1] - self.y[0])).astype(int)
+        inside = (col >= 0) & (col < len(self.x)) & (row >= 0) & (row < len(self.y))
+        return np.where(inside, row * len(self.x) + col, -1)
+
+    def _friction(self, cells):
+        mu = np.full(len(cells), self.base_friction)
+        on_map = cells >= 0
+        mu[on_map] = self.grid.flat[cells[on_map]]
+        mu[np.isnan(mu)] = self.base_friction
+        return mu
+
+    def friction_at(self, path_m):
+        return self._friction(self._cells(path_m))
+
+    def _alpha_of(self, path_m):
+        # Position of a lap time line between the resampled boundaries (0 inner, 1 outer), the
+        # QP's warm start; None for lines not sampled like the QP (other methods)
+        from min_curvature import resample_boundaries
+
+        if self.method != 'lap_time' or len(path_m) != self.nseg:
+            return None
+        outer_interp, inner_interp = resample_boundaries(self.outer_m, self.inner_m, self.nseg)
+        delta = (outer_interp - inner_interp)[:-1]
+        offset = (path_m - inner_interp)[:-1]
+        return np.clip(np.sum(offset * delta, axis=1) / np.sum(delta * delta, axis=1), 0.0, 1.0)
+
+    def _set_line(self, path_m, alpha, weights):
+        from speed_profile import segment_lengths, speed_profile
+        from track_curve import path_curvature
+
+        self.line = path_m
+        self.cells = self._cells(path_m)
+        self.ds = segment_lengths(path_m)
+        self.curvature = path_curvature(path_m)
+        self.profile = speed_profile(self.ds, self.curvature, self._friction(self.cells), self.vehicle)
+        self.alpha = alpha
+        self.line_weights = weights
+
+    def _solve(self, max_iter):
+        # Lap time QP iterations, warm-started from the current line and its
+        # (possibly updated) speed profile; returns whether a faster line was found
+        from lap_time import min_lap_time_path, time_weights
+
+        weights0 = None if self.alpha is None else time_weights(self.profile['speed'], self.line_weights)
+        path, history = min_lap_time_path(self.outer_m, self.inner_m, nseg=self.nseg, friction=self.friction_at,
+                                          vehicle=self.vehicle, max_iter=max_iter, metric=True,
+                                          alpha0=self.alpha, weights0=weights0)
+        best = min(history, key=lambda entry: entry['lap_time'])
+        if best['lap_time'] >= self.profile['lap_time']:
+            return False
+        self._set_line(path, best['alpha'], best['weights'])
+        return True
+
+    def _friction_changed(self, flat, resolve_line):
+        from speed_profile import update_speed_profile
+
+        timings = {}
+        start = time.perf_counter()
+        changed = np.isin(self.cells, flat)
+        if changed.any():
+            self.profile = update_speed_profile(self.profile, self.ds, self.curvature, self._friction(self.cells),
+                                                changed, self.vehicle)
+        timings['speed_profile'] = time.perf_counter() - start
+
+        # The line only moves if the friction under it changed, and only lap time lines depend on friction
+        line_moved = False
+        if resolve_line and changed.any() and self.method == 'lap_time':
+            start = time.perf_counter()
+            line_moved = self._solve(UPDATE_ITERATIONS)
+            timings['racing_line'] = time.perf_counter() - start
+        return {'changed_samples': int(changed.sum()), 'line_moved': line_moved, 'timings': timings}
+
+    def paint(self, points, friction, radius=None, resolve_line=True):
+        """
+        Paint one brush stroke through lon/lat points with the given
+        friction (radius in metres) and update the line and speed profile.
+        """
+        with self.lock:
+            self.brush.radius = radius or BRUSH_RADIUS
+            self.brush.begin_stroke()
+            for lon, lat in points:
+                self.brush.drag(lon, lat, friction)
+            changed_cells = self.brush.end_stroke()
+            if not changed_cells:
+                return {'changed_cells': 0, 'changed_samples': 0, 'line_moved': False, 'timings': {}}
+            update = self._friction_changed(self.brush.undo_stack[-1][0], resolve_line)
+            return {'changed_cells': changed_cells, **update}
+
+    def undo(self, resolve_line=True):
+        with self.lock:
+            if self.brush.undo() is None:
+                return {'changed_cells': 0, 'changed_samples': 0, 'line_moved': False, 'timings': {}}
+            flat = self.brush.redo_stack[-1][0]
+            return {'changed_cells': len(flat), **self._friction_changed(flat, resolve_line)}
+
+    def output(self):
+        # Current line and profile in the shape circuit_processor renders
+        return {'inner': self.inner, 'outer': self.outer, 'racing_line': self.frame.inverse(self.line),
+                'profile': self.profile, 'lap_time': self.profile['lap_time']}
+
+
+class FrictionSessions:
+    """
+    Most recently used FrictionSessions by circuit job id, at most
+    max_sessions of them.
+    """
+
+    def __init__(self, max_sessions=8):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id, track_file, line, params=None):
+        with self._lock:
+            session = self._sessions.get(job_id)
+            if session is not None:
+                self._sessions.move_to_end(job_id)
+                return session
+
+        # Built outside the lock so other circuits are not blocked; a rare
+        # duplicate build for the same job just loses the race
+        session = FrictionSession(track_file, line, params)
+        with self._lock:
+            session = self._sessions.setdefault(job_id, session)
+            self._sessions.move_to_end(job_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import pickle
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from session_store import CACHE_DIR, find_sessions
+
+TOP_N = 10
+PACE_SCALE = 0.5  # Seconds of predicted Q3 gap per e-fold drop of a regressor's score
+
+
+def normalise_race_name(name):
+    # 'Bahrain GP', 'Bahrain Grand Prix' and '2023-03-05_Bahrain_Grand_Prix' all become 'bahraingrandprix'
+    name = re.sub(r'^\d{4}-\d{2}-\d{2}_', '', str(name)).lower()
+    name = re.sub(r'\bgp\b', 'grand prix', name.replace('_', ' '))
+    return re.sub(r'[^a-z0-9]', '', name)
+
+
+def model_version(path):
+    # Short content hash, so predictions are cached per model file rather than per process
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def _load_ff1(session_dir, name):
+    with open(os.path.join(session_dir, f'{name}.ff1pkl'), 'rb') as f:
+        return pickle.load(f)['data']
+
+
+def find_qualifying_sessions(cache_dir=CACHE_DIR):
+    """
+    Qualifying sessions in a FastF1 cache tree (cache/<year>/<event>/<session>/),
+    as dicts with year, event folder name and session directory, in date order.
+    """
+    return [{'year': s['year'], 'event': s['event'], 'path': s['path']} for s in find_sessions(cache_dir)
+            if s['session'].endswith('_Qualifying')
+            and os.path.exists(os.path.join(s['path'], '_extended_timing_data.ff1pkl'))]
+
+
+def _best_q1_q2(driver, part, lap_time, names):
+    # Best Q1 and Q2 lap per driver (seconds) for the drivers who set both, indexed by driver name
+    best = (pd.DataFrame({'driver': driver, 'part': part, 'lap': lap_time})
+            .dropna()
+            .groupby(['driver', 'part'])['lap'].min()
+            .unstack())
+    features = best.reindex(columns=[1, 2]).set_axis(['Q1_sec', 'Q2_sec'], axis=1).dropna()
+    features.index = [names.get(number, number) for number in features.index]
+    return features
+
+
+def qualifying_features(session_dir):
+    """
+    Per-driver features of one cached qualifying session: the best lap of
+    each driver in Q1 and Q2 (seconds), for the drivers who set both.
+    Returns the race metadata and a DataFrame indexed by driver name with
+    Q1_sec and Q2_sec columns.
+    """
+    laps, _, split_times = _load_ff1(session_dir, '_extended_timing_data')
+    info = _load_ff1(session_dir, 'session_info')
+    drivers = _load_ff1(session_dir, 'driver_info')
+
+    # Session part of every lap from the Q1/Q2/Q3 start times
+    splits = np.array([split.total_seconds() for split in split_times])
+    part = np.searchsorted(splits, laps['Time'].dt.total_seconds().to_numpy(), side='right')
+    names = {number: f"{d.get('FirstName', '')} {d.get('LastName', '')}".strip() or number
+             for number, d in drivers.items()}
+    features = _best_q1_q2(laps['Driver'].to_numpy(), part, laps['LapTime'].dt.total_seconds().to_numpy(), names)
+
+    meeting = info['Meeting']
+    race = {
+        'name': meeting['Name'],
+        'country': meeting.get('Country', {}).get('Name'),
+        'location': meeting.get('Location'),
+        'date': info['StartDate'].date().isoformat(),
+    }
+    return race, features
+
+
+def store_qualifying_features(store, key):
+    """
+    qualifying_features() of a session ingested into a SessionStore (see
+    session_store.py), read from its lap and driver columns instead of the
+    raw pickles.
+    """
+    entry = store.index[key]
+    tables = store.load(key)
+    laps, drivers = tables['laps'], tables['drivers']
+    names = {number: f"{first} {last}".strip() or number
+             for number, first, last in zip(drivers.get('number', []), drivers.get('first_name', []),
+                                            drivers.get('last_name', []))}
+    features = _best_q1_q2(laps['driver'], laps['part'], laps['lap_time'], names)
+    race = {field: entry[field] for field in ('name', 'country', 'location', 'date')}
+    return race, features
+
+
+class PredictionService:
+    """
+    Q3 predictions for every race in the FastF1 cache.
+
+    Features come from each race's qualifying session in the SessionStore
+    (falling back to the raw FastF1 cache for sessions not ingested yet)
+    and are read once. Predictions are memoized per (race, model version); a season is
+    scored with one model call for all of its uncached races. Classifiers
+    rank drivers by predict_proba (driver classes decoded with one
+    vectorized inverse_transform); regressors predict every driver's Q3
+    time, rank by it, and report a pace score
+    exp(-gap to the fastest / PACE_SCALE) as the probability.
+    """
+
+    def __init__(self, model, label_encoder, version, cache_dir=CACHE_DIR, store=None):
+        self.model = model
+        self.store = store
+        self.label_encoder = label_encoder
+        self.version = version
+        self.cache_dir = cache_dir
+        self._races = None
+        self._features = {}
+        self._predictions = {}
+        # Guards the memo dicts only; loading and scoring run outside it, so a request never
+        # waits for the warm-up (or another request) to finish scoring other races
+        self._lock = threading.Lock()
+
+    def races(self):
+        # Cached races by key (year, event folder), indexed once
+        if self._races is None:
+            races = {(s['year'], s['event']): s for s in find_qualifying_sessions(self.cache_dir)}
+            if self.store is not None:
+                for store_key, entry in self.store.sessions(session_type='Qualifying').items():
+                    races.setdefault((entry['year'], entry['event']), {})['store_key'] = store_key
+            with self._lock:
+                if self._races is None:
+                    self._races = races
+        return self._races
+
+    def find_race(self, name, year=None):
+        """
+        Key of the cached race matching a race name ('Bahrain GP', an event
+        folder, a country or location), latest season first. None if the
+        cache has no such race.
+        """
+        target = normalise_race_name(name)
+        for key in sorted(self.races(), reverse=True):
+            if year is not None and key[0] != int(year):
+                continue
+            race, _ = self._race_features(key)
+            aliases = {key[1], race['name'], race['country'], race['location']}
+            if target in {normalise_race_name(alias) for alias in aliases if alias}:
+                return key
+        return None
+
+    def _race_features(self, key):
+        with self._lock:
+            features = self._features.get(key)
+        if features is None:
+            # Loaded without the lock; two threads loading the same race keep the first result
+            race = self.races()[key]
+            if 'store_key' in race:
+                features = store_qualifying_features(self.store, race['store_key'])
+            else:
+                features = qualifying_features(race['path'])
+            with self._lock:
+                features = self._features.setdefault(key, features)
+        return features
+
+    def predict(self, key):
+        return self.predict_many([key])[key]
+
+    def season(self, year):
+        keys = sorted(key for key in self.races() if key[0] == int(year))
+        return self.predict_many(keys)
+
+    def predict_many(self, keys):
+        """
+        Predictions for many races, scoring all that are not memoized yet
+        in a single model call. Returns {key: result dict}.
+        """
+        with self._lock:
+            missing = [key for key in keys if (key, self.version) not in self._predictions]
+        if missing:
+            results = self._score([self._race_features(key) for key in missing])
+            with self._lock:
+                for key, result in zip(missing, results):
+                    self._predictions.setdefault((key, self.version), result)
+        with self._lock:
+            return {key: self._predictions[(key, self.version)] for key in keys}
+
+    def _score(self, races):
+        features = [f for _, f in races]
+        counts = np.array([len(f) for f in features])
+        stacked = pd.concat(features) if features else pd.DataFrame(columns=['Q1_sec', 'Q2_sec'])
+        rows = np.split(np.arange(len(stacked)), np.cumsum(counts)[:-1])
+        results = [{'race': race, 'model_version': self.version} for race, _ in races]
+
+        if hasattr(self.model, 'predict_proba'):
+            proba = self.model.predict_proba(stacked)
+            # Average each race's rows into one distribution over driver classes
+            top = []
+            for result, race_rows in zip(results, rows):
+                race_proba = proba[race_rows].mean(axis=0)
+                order = np.argsort(race_proba)[::-1][:TOP_N]
+                top.append((order, race_proba[order]))
+            names = self.label_encoder.inverse_transform(np.concatenate([order for order, _ in top]))
+            offsets = np.cumsum([0] + [len(order) for order, _ in top])
+            for i, (result, (_, probability)) in enumerate(zip(results, top)):
+                result['predictions'] = [
+                    {'position': p + 1, 'driver': driver, 'probability': float(prob)}
+                    for p, (driver, prob) in enumerate(zip(names[offsets[i]:offsets[i + 1]], probability))
+                ]
+            return results
+
+        predicted = self.model.predict(stacked)
+        drivers = stacked.index.to_numpy()
+        for result, race_rows in zip(results, rows):
+            order = race_rows[np.argsort(predicted[race_rows])][:TOP_N]
+            gap = predicted[order] - predicted[order[0]] if len(order) else np.empty(0)
+            result['predictions'] = [
+                {'position': p + 1, 'driver': str(drivers[i]), 'probability': float(np.exp(-g / PACE_SCALE)),
+                 'predicted_time': round(float(predicted[i]), 3)}
+                for p, (i, g) in enumerate(zip(order, gap))
+            ]
+        return results
+
+    def warm(self):
+        # Score every cached race up front (e.g. in a background thread at start-up)
+        self.predict_many(sorted(self.races()))
@@ -0,0 +1,297 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BACKEND_DIR, 'cache')
+STORE_DIR = os.environ.get('SESSION_STORE_DIR', os.path.join(BACKEND_DIR, 'data', 'sessions'))
+STORE_VERSION = 1  # Bump when the extracted columns change; every session is re-ingested
+
+# Columns of each table: store column -> FastF1 column
+LAP_COLUMNS = {
+    'driver': 'Driver', 'time': 'Time', 'lap_time': 'LapTime', 'lap_number': 'NumberOfLaps',
+    'pit_stops': 'NumberOfPitStops', 'pit_out_time': 'PitOutTime', 'pit_in_time': 'PitInTime',
+    'sector1_time': 'Sector1Time', 'sector2_time': 'Sector2Time', 'sector3_time': 'Sector3Time',
+    'speed_i1': 'SpeedI1', 'speed_i2': 'SpeedI2', 'speed_fl': 'SpeedFL', 'speed_st': 'SpeedST',
+    'personal_best': 'IsPersonalBest',
+}
+WEATHER_COLUMNS = {
+    'time': 'Time', 'air_temp': 'AirTemp', 'humidity': 'Humidity', 'pressure': 'Pressure',
+    'rainfall': 'Rainfall', 'track_temp': 'TrackTemp', 'wind_direction': 'WindDirection', 'wind_speed': 'WindSpeed',
+}
+TRACK_STATUS_COLUMNS = {'time': 'Time', 'status': 'Status', 'message': 'Message'}
+DRIVER_COLUMNS = {'number': 'RacingNumber', 'abbreviation': 'Tla', 'first_name': 'FirstName',
+                  'last_name': 'LastName', 'team': 'TeamName'}
+TABLES = ('laps', 'weather', 'track_status', 'drivers')
+
+
+def find_sessions(cache_dir=CACHE_DIR):
+    """
+    Sessions in a FastF1 cache tree (cache/<year>/<event>/<session>/*.ff1pkl),
+    as dicts with year, event and session folder names, key and directory.
+    """
+    sessions = []
+    for year in sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []:
+        year_dir = os.path.join(cache_dir, year)
+        if not year.isdigit() or not os.path.isdir(year_dir):
+            continue
+        for event in sorted(os.listdir(year_dir)):
+            event_dir = os.path.join(year_dir, event)
+            for session in sorted(os.listdir(event_dir)) if os.path.isdir(event_dir) else []:
+                session_dir = os.path.join(event_dir, session)
+                if os.path.exists(os.path.join(session_dir, 'session_info.ff1pkl')):
+                    sessions.append({'year': int(year), 'event': event, 'session': session,
+                                     'key': f'{year}/{event}/{session}', 'path': session_dir})
+    return sessions
+
+
+def session_fingerprint(session_dir):
+    # Names, sizes and modification times of the session's pickles; changes when FastF1 adds or refreshes data
+    digest = hashlib.sha256(str(STORE_VERSION).encode())
+    for name in sorted(os.listdir(session_dir)):
+        if name.endswith('.ff1pkl'):
+            stat = os.stat(os.path.join(session_dir, name))
+            digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def _load_ff1(session_dir, name):
+    path = os.path.join(session_dir, f'{name}.ff1pkl')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)['data']
+
+
+def _seconds(values):
+    # Timedeltas (pandas, NumPy or datetime) as float seconds, NaN where missing
+    values = np.asarray(values)
+    if values.dtype.kind == 'm':
+        seconds = values.astype('timedelta64[ns]').astype(np.int64) / 1e9
+        return np.where(np.isnat(values), np.nan, seconds)
+    return np.array([np.nan if v is None else v.total_seconds() for v in values], dtype=float)
+
+
+def _column(values):
+    # Compact NumPy column: seconds for times, fixed-width strings for text, as-is otherwise
+    values = np.asarray(values)
+    if values.dtype.kind == 'm' or (values.dtype == object and len(values)
+                                   and hasattr(values[0], 'total_seconds')):
+        return _seconds(values)
+    if values.dtype == object:
+        return np.array(['' if v is None else str(v) for v in values], dtype=str)
+    return values
+
+
+def _table(source, columns):
+    # Table dict of one FastF1 DataFrame or dict of lists; missing columns are left out
+    if source is None:
+        return {}
+    return {name: _column(source[column]) for name, column in columns.items() if column in source}
+
+
+def extract_session(session_dir):
+    """
+    Lap, weather, track status and driver tables of one cached session, as
+    flat {'<table>/<column>': array} fields plus the session metadata.
+    Times are float seconds from the session start (NaN where missing);
+    laps also get the session part they were set in (1-3 for Q1-Q3, 0 if
+    the session has no parts).
+    """
+    info = _load_ff1(session_dir, 'session_info')
+    timing = _load_ff1(session_dir, '_extended_timing_data')
+    drivers = _load_ff1(session_dir, 'driver_info') or {}
+
+    tables = {
+        'laps': _table(timing[0] if timing else None, LAP_COLUMNS),
+        'weather': _table(_load_ff1(session_dir, 'weather_data'), WEATHER_COLUMNS),
+        'track_status': _table(_load_ff1(session_dir, 'track_status_data'), TRACK_STATUS_COLUMNS),
+        'drivers': _table({column: [d.get(column) for d in drivers.values()] for column in DRIVER_COLUMNS.values()},
+                          DRIVER_COLUMNS),
+    }
+
+    laps = tables['laps']
+    split_times = timing[2] if timing and len(timing) > 2 else []
+    if 'time' in laps:
+        parts = np.zeros(len(laps['time']), dtype=np.int8)
+        if split_times:
+            parts[:] = np.searchsorted(_seconds(split_times), laps['time'], side='right')
+        laps['part'] = parts
+
+    meeting = info.get('Meeting', {})
+    meta = {
+        'name': meeting.get('Name'),
+        'country': meeting.get('Country', {}).get('Name'),
+        'location': meeting.get('Location'),
+        'session_type': info.get('Type'),
+        'session_name': info.get('Name'),
+        'date': info['StartDate'].date().isoformat() if info.get('StartDate') else None,
+        'rows': {table: len(next(iter(columns.values()), [])) for table, columns in tables.items()},
+    }
+    fields = {f'{table}/{column}': values for table, columns in tables.items() for column, values in columns.items()}
+    return fields, meta
+
+
+def ingest_session(session, store_dir):
+    """
+    Worker entry point: extract one session and write it to
+    <store_dir>/<year>/<event>/<session>.npz. Returns its index entry.
+    """
+    start = time.perf_counter()
+    fields, meta = extract_session(session['path'])
+    path = os.path.join(store_dir, f"{session['key']}.npz")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez_compressed(tmp_path, **fields)
+    os.replace(tmp_path, path)
+    return {**meta, 'year': session['year'], 'event': session['event'], 'session': session['session'],
+            'file': os.path.relpath(path, store_dir), 'fingerprint': session['fingerprint'],
+            'seconds': time.perf_counter() - start}
+
+
+class SessionStore:
+    """
+    Columnar store of FastF1 session data, built offline from the cache.
+
+    Every session is one compressed .npz of flat columns ('laps/lap_time',
+    'weather/air_temp', ...), indexed by season/event/session in
+    index.json. ingest() is incremental: only sessions whose pickles are
+    new or changed since the last run are re-extracted (across a process
+    pool), and sessions removed from the cache are dropped.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        self.index_path = os.path.join(store_dir, 'index.json')
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == STORE_VERSION:
+                self.index = stored['sessions']
+
+    def _save_index(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'sessions': self.index}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def ingest(self, cache_dir=CACHE_DIR, max_workers=None, force=False):
+        """
+        Bring the store up to date with the cache. Returns one result dict
+        per session: status 'ingested', 'unchanged' or 'failed'.
+        """
+        sessions = find_sessions(cache_dir)
+        for session in sessions:
+            session['fingerprint'] = session_fingerprint(session['path'])
+
+        results = []
+        pending = []
+        for session in sessions:
+            entry = self.index.get(session['key'])
+            if not force and entry is not None and entry['fingerprint'] == session['fingerprint'] \
+                    and os.path.exists(os.path.join(self.store_dir, entry['file'])):
+                results.append({'key': session['key'], 'status': 'unchanged', 'seconds': 0.0})
+            else:
+                pending.append(session)
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(ingest_session, session, self.store_dir): session for session in pending}
+                for future in as_completed(futures):
+                    key = futures[future]['key']
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        results.append({'key': key, 'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                                        'seconds': float('nan')})
+                        continue
+                    self.index[key] = {k: v for k, v in entry.items() if k != 'seconds'}
+                    results.append({'key': key, 'status': 'ingested', 'seconds': entry['seconds'],
+                                    'rows': entry['rows']})
+
+        # Sessions no longer in the cache
+        current = {session['key'] for session in sessions}
+        for key in [key for key in self.index if key not in current]:
+            path = os.path.join(self.store_dir, self.index.pop(key)['file'])
+            if os.path.exists(path):
+                os.remove(path)
+            results.append({'key': key, 'status': 'removed', 'seconds': 0.0})
+
+        self._save_index()
+        return sorted(results, key=lambda r: r['key'])
+
+    def sessions(self, year=None, event=None, session_type=None):
+        # Index entries by key, filtered by season, event folder and session type ('Qualifying', 'Race', ...)
+        return {key: entry for key, entry in sorted(self.index.items())
+                if (year is None or entry['year'] == int(year))
+                and (event is None or entry['event'] == event)
+                and (session_type is None or entry['session_type'] == session_type)}
+
+    def load(self, key, table=None):
+        """
+        Tables of one session as {table: {column: array}}, or just the
+        columns of one table.
+        """
+        with np.load(os.path.join(self.store_dir, self.index[key]['file'])) as data:
+            tables = {name: {} for name in TABLES}
+            for field in data.files:
+                name, column = field.split('/', 1)
+                tables.setdefault(name, {})[column] = data[field]
+        return tables if table is None else tables[table]
+
+    def table(self, table, year=None, event=None, session_type=None):
+        """
+        One table across many sessions as a pandas DataFrame, with year,
+        event and session columns identifying the rows of each session.
+        """
+        import pandas as pd
+
+        frames = []
+        for key, entry in self.sessions(year, event, session_type).items():
+            columns = self.load(key, table)
+            rows = entry['rows'].get(table, 0)
+            frames.append(pd.DataFrame({'year': np.full(rows, entry['year']), 'event': entry['event'],
+                                        'session': entry['session'], **columns}))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def print_summary(results):
+    header = f"{'session':<60} {'status':<10} {'laps':>6} {'weather':>7} {'seconds':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        if r['status'] == 'failed':
+            print(f"{r['key']:<60} {'failed':<10} {r['error']}")
+        else:
+            rows = r.get('rows', {})
+            print(f"{r['key']:<60} {r['status']:<10} {rows.get('laps', ''):>6} {rows.get('weather', ''):>7} "
+                  f"{r['seconds']:>8.3f}")
+
+    counts = {status: sum(r['status'] == status for r in results) for status in ('ingested', 'unchanged', 'failed')}
+    print(f"\n{counts['ingested']} ingested, {counts['unchanged']} unchanged, {counts['failed']} failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the FastF1 session cache into the columnar session store.")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="FastF1 cache directory (default: backend/cache)")
+    parser.add_argument('--store-dir', default=STORE_DIR, help="Session store directory (default: backend/data/sessions)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Re-ingest every session, not just new or changed ones")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = SessionStore(args.store_dir).ingest(args.cache_dir, max_workers=args.workers, force=args.force)
+    print_summary(results)
+    print(f"Wall time: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from prediction_service import normalise_race_name
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+TRACKS_PATH = os.path.join(BACKEND_DIR, 'data', 'tracks.json')
+WINNERS_PATH = os.path.join(BACKEND_DIR, 'data', 'f1_winners_2023_2024.json')
+MAX_RESPONSES = 256  # Serialized responses kept per store (one per distinct query)
+
+
+class TrackCatalog:
+    """
+    Circuits and race winners, loaded once and indexed in memory.
+
+    Circuits come from data/tracks.json (shared with the frontend) and are
+    joined with their past winners from the scraped winners file. Both are
+    indexed by circuit alias (name, grand prix, country), season,
+    winning driver and both, so a filtered query is a few set intersections.
+    Responses are serialized once per distinct query and kept as bytes
+    with their ETag.
+    """
+
+    def __init__(self, tracks_path=TRACKS_PATH, winners_path=WINNERS_PATH):
+        with open(tracks_path, encoding='utf-8') as f:
+            circuits = json.load(f)
+        with open(winners_path, encoding='utf-8') as f:
+            seasons = json.load(f)
+
+        self.winners = []
+        for year, races in seasons.items():
+            for race in races:
+                self.winners.append({
+                    'year': int(year),
+                    'grandPrix': race['grand_prix'],
+                    'date': race['date'],
+                    'winner': race['winner'],
+                    'team': race['car'],
+                    'laps': int(race['laps']),
+                    'time': race['time'],
+                })
+        self.winners.sort(key=lambda w: (-w['year'], w['grandPrix']))
+
+        winners_by_key = {}
+        for i, winner in enumerate(self.winners):
+            winners_by_key.setdefault(winner['grandPrix'], []).append(i)
+
+        self.tracks = []
+        self.by_circuit, self.by_year, self.by_driver, self.by_year_driver = {}, {}, {}, {}
+        self.winner_circuit = {}
+        for t, circuit in enumerate(circuits):
+            key = circuit.pop('winners', None)
+            won = winners_by_key.get(key, [])
+            circuit['pastWinners'] = [{k: self.winners[i][k] for k in ('year', 'winner', 'team', 'time')}
+                                      for i in won]
+            self.tracks.append(circuit)
+            for alias in (circuit['name'], circuit.get('grandPrix'), circuit['country'], key):
+                if alias:
+                    self.by_circuit.setdefault(normalise_race_name(alias), set()).add(t)
+            for i in won:
+                year, driver = self.winners[i]['year'], normalise_race_name(self.winners[i]['winner'])
+                self.winner_circuit[i] = t
+                self.by_year.setdefault(year, set()).add(t)
+                self.by_driver.setdefault(driver, set()).add(t)
+                self.by_year_driver.setdefault((year, driver), set()).add(t)
+
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def find_tracks(self, circuit=None, year=None, driver=None, search=None):
+        """
+        Indices of the circuits matching every given filter: circuit alias,
+        season with a recorded winner, winning driver, and a substring of
+        the name or country. A season and a driver together match the
+        circuits that driver won in that season.
+        """
+        matches = set(range(len(self.tracks)))
+        if circuit:
+            matches &= self.by_circuit.get(normalise_race_name(circuit), set())
+        if year is not None and driver:
+            matches &= self.by_year_driver.get((int(year), normalise_race_name(driver)), set())
+        elif year is not None:
+            matches &= self.by_year.get(int(year), set())
+        elif driver:
+            matches &= self.by_driver.get(normalise_race_name(driver), set())
+        if search:
+            search = search.lower()
+            matches = {t for t in matches
+                       if search in self.tracks[t]['name'].lower() or search in self.tracks[t]['country'].lower()}
+        return sorted(matches)
+
+    def find_winners(self, circuit=None, year=None, driver=None):
+        circuits = set(self.find_tracks(circuit=circuit)) if circuit else None
+        return [i for i, winner in enumerate(self.winners)
+                if (year is None or winner['year'] == int(year))
+                and (not driver or normalise_race_name(winner['winner']) == normalise_race_name(driver))
+                and (circuits is None or self.winner_circuit.get(i) in circuits)]
+
+    def response(self, kind, offset=0, limit=None, **filters):
+        """
+        One page of tracks or winners matching the filters, as
+        (JSON bytes, ETag, total matches). Serialized once per distinct
+        query; later calls return the same bytes.
+        """
+        key = (kind, offset, limit, tuple(sorted((k, v) for k, v in filters.items() if v not in (None, ''))))
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+                return cached
+
+        if kind == 'tracks':
+            rows, items = self.find_tracks(**filters), self.tracks
+        else:
+            rows, items = self.find_winners(**filters), self.winners
+        page = rows[offset:None if limit is None else offset + limit]
+        body = json.dumps([items[i] for i in page], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        cached = (body, hashlib.sha1(body).hexdigest(), len(rows))
+
+        with self._lock:
+            self._responses[key] = cached
+            while len(self._responses) > MAX_RESPONSES:
+                self._responses.popitem(last=False)
+        return cached
@@ -1,340 +1,5 @@
 import { Track } from '../types';
+// Shared with the backend, which serves the same circuits (with past winners) from /api/tracks
+import trackData from '../../backend/data/tracks.json';
 
-export const tracks: Track[] = [
-  {
-    id: 1,
-    name: 'Circuit de Monaco',
-    country: 'Monaco',
-    length: 3.337,
-    corners: 19,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:12.909',
-      driver: 'Lewis Hamilton',
-      year: 2021
-    },
-    image: '/public/images/monaco.jpg'
-  },
-  {
-    id: 2,
-    name: 'Silverstone Circuit',
-    country: 'United Kingdom',
-    length: 5.891,
-    corners: 18,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:27.097',
-      driver: 'Max Verstappen',
-      year: 2020
-    },
-    image: '/public/images/silverstone.jpg'
-  },
-  {
-    id: 3,
-    name: 'Circuit of the Americas',
-    country: 'United States',
-    length: 5.513,
-    corners: 20,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:36.169',
-      driver: 'Charles Leclerc',
-      year: 2019
-    },
-    image: '/public/images/america.jpg'
-  },
-  {
-    id: 4,
-    name: 'Suzuka Circuit',
-    country: 'Japan',
-    length: 5.807,
-    corners: 18,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:30.983',
-      driver: 'Lewis Hamilton',
-      year: 2019
-    },
-    image: '/public/images/japan.jpg'
-  },
-  {
-    id: 5,
-    name: 'Spa-Francorchamps',
-    country: 'Belgium',
-    length: 7.004,
-    corners: 19,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:46.286',
-      driver: 'Valtteri Bottas',
-      year: 2018
-    },
-    image: '/public/images/belgium.jpg'
-  },
-  {
-    id: 6,
-    name: 'Monza Circuit',
-    country: 'Italy',
-    length: 5.793,
-    corners: 11,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:21.046',
-      driver: 'Rubens Barrichello',
-      year: 2004
-    },
-    image: '/public/images/italy.jpg'
-  },
-  {
-    id: 7,
-    name: 'Interlagos Circuit',
-    country: 'Brazil',
-    length: 4.309,
-    corners: 15,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:10.540',
-      driver: 'Lewis Hamilton',
-      year: 2018
-    },
-    image: '/public/images/brazil.jpg'
-  },
-  {
-    id: 8,
-    name: 'Marina Bay Street Circuit',
-    country: 'Singapore',
-    length: 5.063,
-    corners: 23,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:41.905',
-      driver: 'Lewis Hamilton',
-      year: 2018
-    },
-    image: 'public/images/singapore.jpg'
-  },
-  {
-    id: 9,
-    name: 'Yas Marina Circuit',
-    country: 'United Arab Emirates',
-    length: 5.554,
-    corners: 21,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:39.283',
-      driver: 'Lewis Hamilton',
-      year: 2019
-    },
-    image: '/public/images/uae.jpg'
-  },
-  {
-    id: 10,
-    name: 'Red Bull Ring',
-    country: 'Austria',
-    length: 4.318,
-    corners: 10,
-    drsZones: 3,
-    lapRecord: {
-      time: '1:05.619',
-      driver: 'Carlos Sainz',
-      year: 2020
-    },
-    image: 'public/images/austria.jpg'
-  },
-  {
-    id: 11,
-    name: 'Hungaroring',
-    country: 'Hungary',
-    length: 4.381,
-    corners: 14,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:16.627',
-      driver: 'Lewis Hamilton',
-      year: 2020
-    },
-    image: 'public/images/hungary.jpg'
-  },
-  {
-    id: 12,
-    name: 'Circuit de Barcelona-Catalunya',
-    country: 'Spain',
-    length: 4.655,
-    corners: 16,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:18.149',
-      driver: 'Valtteri Bottas',
-      year: 2020
-    },
-    image: '/public/images/spain.jpg'
-  },
-  {
-    id: 13,
-    name: 'Shanghai International Circuit',
-    country: 'China',
-    length: 5.451,
-    corners: 16,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:31.095',
-      driver: 'Michael Schumacher',
-      year: 2004
-    },
-    image: '/public/images/china.jpg'
-  },
-  {
-    id: 14,
-    name: 'Bahrain International Circuit',
-    country: 'Bahrain',
-    length: 5.412,
-    corners: 15,
-    drsZones: 3,
-    lapRecord: {
-      time: '1:31.447',
-      driver: 'Pedro de la Rosa',
-      year: 2005
-    },
-    image: '/public/images/bahrain.jpg'
-  },
-  {
-    id: 15,
-    name: 'Miami International Autodrome',
-    country: 'United States of America',
-    length: 5.412,
-    corners: 19,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:29.708',
-      driver: 'Max Verstappen',
-      year: 2023
-    },
-    image: 'public/images/miami.jpg'
-  },
-  {
-    id: 16,
-    name: 'Las Vegas Strip Circuit',
-    country: 'United States of America',
-    length: 6.201,
-    corners: 17,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:35.490',
-      driver: 'Charles Leclerc',
-      year: 2023
-    },
-    image: 'public/images/las_vegas.jpg'
-  },
-  {
-    id: 17,
-    name: 'Circuit Gilles Villeneuve',
-    country: 'Canada',
-    length: 4.361,
-    corners: 14,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:13.078',
-      driver: 'Valtteri Bottas',
-      year: 2019
-    },
-    image: 'public/images/canada.jpg'
-  },
-  {
-    id: 18,
-    name: 'Autódromo Hermanos Rodríguez',
-    country: 'Mexico',
-    length: 4.304,
-    corners: 17,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:18.741',
-      driver: 'Valtteri Bottas',
-      year: 2018
-    },
-    image: 'public/images/mexico.jpg'
-  },
-  {
-    id: 19,
-    name: 'Albert Park Circuit',
-    country: 'Australia',
-    length: 5.303,
-    corners: 16,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:24.125',
-      driver: 'Michael Schumacher',
-      year: 2004
-    },
-    image: 'public/images/australia.jpg'
-  },
-  {
-    id: 20,
-    name: 'Baku City Circuit',
-    country: 'Azerbaijan',
-    length: 6.003,
-    corners: 20,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:43.009',
-      driver: 'Charles Leclerc',
-      year: 2019
-    },
-    image: 'public/images/azbjn.jpg'
-  },
-  {
-    id: 21,
-    name: 'Lusail International Circuit',
-    country: 'Qatar',
-    length: 5.380,
-    corners: 16,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:23.196',
-      driver: 'Max Verstappen',
-      year: 2023
-    },
-    image: 'public/images/qatar.jpg'
-  },
-  {
-    id: 22,
-    name: 'Autodromo Internazionale Enzo e Dino Ferrari',
-    country: 'Italy',
-    length: 4.909,
-    corners: 19,
-    drsZones: 1,
-    lapRecord: {
-      time: '1:15.484',
-      driver: 'Lewis Hamilton',
-      year: 2020
-    },
-    image: 'public/images/imola.jpg'
-  },
-  {
-    id: 23,
-    name: 'Circuit Zandvoort',
-    country: 'Netherlands',
-    length: 4.259,
-    corners: 14,
-    drsZones: 2,
-    lapRecord: {
-      time: '1:11.097',
-      driver: 'Lewis Hamilton',
-      year: 2021
-    },
-    image: 'public/images/netherlands.jpg'
-  },
-  {
-    id: 24,
-    name: 'Jeddah Corniche Circuit',
-    country: 'Saudi Arabia',
-    length: 6.174,
-    corners: 27,
-    drsZones: 3,
-    lapRecord: {
-      time: '1:28.049',
-      driver: 'Lewis Hamilton',
-      year: 2021
-    },
-    image: 'public/images/saudi.jpg'
-  }
-];
\ No newline at end of file
+export const tracks: Track[] = trackData;
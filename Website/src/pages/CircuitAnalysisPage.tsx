@@ -10,6 +10,7 @@ interface CircuitAnalysisPageProps {
 const CircuitAnalysisPage: React.FC<CircuitAnalysisPageProps> = ({ theme }) => {
   const [circuitImage, setCircuitImage] = useState<string | null>(null);
   const [selectedCircuit, setSelectedCircuit] = useState<string | null>(null);
+  const [circuitJobId, setCircuitJobId] = useState<string | null>(null);
   const [messages, setMessages] = useState<Message[]>([
     {
       id: 1,
@@ -44,8 +45,22 @@ const CircuitAnalysisPage: React.FC<CircuitAnalysisPageProps> = ({ theme }) => {
         });
 
         if (response.ok) {
-          const data = await response.json();
-          setCircuitImage(data.image_url);
+          // The solve runs as a background job; poll until it has finished
+          const { job_id, status_url } = await response.json();
+          let job: { status: string; result?: { image_url: string }; error?: string } = { status: 'queued' };
+          while (job.status === 'queued' || job.status === 'running') {
+            await new Promise((resolve) => setTimeout(resolve, 1000));
+            const statusResponse = await fetch(`http://localhost:5000${status_url}`);
+            if (!statusResponse.ok) break;
+            job = await statusResponse.json();
+          }
+
+          if (job.status === 'done' && job.result) {
+            setCircuitImage(job.result.image_url);
+            setCircuitJobId(job_id);
+          } else {
+            console.error('Failed to process circuit:', job.error);
+          }
         } else {
           console.error('Failed to process image');
         }
@@ -63,6 +78,7 @@ const CircuitAnalysisPage: React.FC<CircuitAnalysisPageProps> = ({ theme }) => {
     const selectedTrack = tracks.find((track) => track.name === selectedName);
     if (selectedTrack) {
       setCircuitImage(selectedTrack.image);
+      setCircuitJobId(null);
       setTrackDetails({
         length: `${selectedTrack.length} km`,
         corners: `${selectedTrack.corners} (${selectedTrack.corners} turns)`,
@@ -141,11 +157,13 @@ const CircuitAnalysisPage: React.FC<CircuitAnalysisPageProps> = ({ theme }) => {
   const clearCircuitImage = () => {
     setCircuitImage(null);
     setSelectedCircuit(null);
+    setCircuitJobId(null);
     setTrackDetails(null);
   };
 
   const handleCanvasClick = async (e: React.MouseEvent<HTMLImageElement>) => {
-    if (!circuitImage) return;
+    // Friction can only be edited on circuits processed by the backend
+    if (!circuitImage || !circuitJobId) return;
 
     const img = e.currentTarget;
     const rect = img.getBoundingClientRect();
@@ -158,7 +176,14 @@ const CircuitAnalysisPage: React.FC<CircuitAnalysisPageProps> = ({ theme }) => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ x, y, friction_value: 1.0 }), // Replace 1.0 with the desired friction value
+        body: JSON.stringify({
+          job_id: circuitJobId,
+          x,
+          y,
+          width: rect.width,
+          height: rect.height,
+          friction_value: 1.0, // Replace 1.0 with the desired friction value
+        }),
       });
 
       if (response.ok) {
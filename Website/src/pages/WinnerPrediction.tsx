@@ -14,6 +14,7 @@ interface Prediction {
 
 interface Track {
   name: string;
+  grandPrix?: string;
   country: string;
   length: number;
   corners: number;
@@ -499,7 +500,8 @@ const WinnerPredictions: React.FC<WinnerPredictionsProps> = ({ theme, currentPag
       const response = await fetch('/api/predict', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ race: selectedRace })
+        // Predictions are looked up by grand prix name, falling back to the circuit name
+        body: JSON.stringify({ race: tracks.find(track => track.name === selectedRace)?.grandPrix ?? selectedRace })
       });
       
       if (!response.ok) throw new Error('Prediction failed');